@@ -112,12 +112,26 @@ CHAT_ID_LIST = [
 LLM_OPTION = "OPENAI"  # "BITDEER" or "GEMINI" or "OPENAI"
 MAX_RETRIES = 5
 RETRY_AFTER = 2
+MAX_BACKOFF = 30  # seconds, cap for the exponential retry backoff
+API_TIMEOUT = 10  # seconds before a Binance API call counts as failed
+BREAKER_FAILURE_THRESHOLD = 5  # consecutive Binance failures before failing fast
+BREAKER_SLEEP_WINDOW = 30  # seconds before a single probe call is let through
+EXIT_RETRY_DELAY = 30  # seconds before the first retry of a failed close, doubling after each retry
+EXIT_MAX_RETRIES = 6  # close retries before asking for the position to be closed manually
 INITIAL_CAPITAL = 100  # USD
 LEVERAGE = 1
 HODL_TIME = 300  # seconds
 TRADE_SENTIMENT_THRESHOLD = 50  # %
 BINANCE_MAINNET_FLAG = True
-NUM_WORKERS = 100
+NUM_WORKERS = 100  # maximum trade workers, the pool scales between MIN_WORKERS and this
+MIN_WORKERS = 4  # idle trade workers kept ready for new signals
+WORKER_SCALE_INTERVAL = 60  # seconds between trade worker pool resizes
+BINANCE_WEIGHT_LIMIT = 2400  # Binance futures request weight allowed per minute
+TEST_NUM_WORKERS = 4  # trade workers in test_binance_trade.py
+MAX_INFLIGHT = 10  # Binance API calls in flight at once, shared by all workers
+LLM_CONCURRENCY = 8  # messages analysed by the LLM concurrently
+MAX_PENDING_MESSAGES = 256  # messages waiting for the LLM before new ones are dropped
+FORWARD_BATCH_INTERVAL = 0.2  # seconds to collect messages before forwarding
 MARKETCAP_UPDATE_INTERVAL = 3600  # seconds
 PROVIDER_MODEL = "openai/gpt-4.1-nano"
 
@@ -2,12 +2,20 @@ import asyncio
 import json
 import time
 import os
-import requests
+import aiohttp
+import orjson
 from config import (TOP_N_MARKETCAP, MARKETCAP_UPDATE_INTERVAL)
 
 # Constants
 MARKET_CAP_FILE = "top_market_cap.json"
 COINGECKO_API_URL = "https://api.coingecko.com/api/v3/coins/markets"
+REQUEST_TIMEOUT = 30  # seconds
+
+# Shared aiohttp session (created lazily inside the running event loop)
+session = None
+
+# In-memory copy of the top symbols: (frozenset of symbols, monotonic expiry)
+top_market_cap_cache = None
 
 # Common stablecoin patterns
 STABLECOIN_PATTERNS = [
@@ -33,7 +41,25 @@ def is_stablecoin(coin_data):
     return False
 
 
-def get_top_market_cap():
+def get_session():
+    """Return the shared aiohttp session, creating it on first use"""
+    global session
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=4, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT))
+    return session
+
+
+async def close_session():
+    """Close the shared aiohttp session"""
+    global session
+    if session is not None and not session.closed:
+        await session.close()
+    session = None
+
+
+async def get_top_market_cap():
     """
     Fetch top N cryptocurrencies by market cap from CoinGecko, excluding stablecoins
     Returns a list of symbols (e.g., ['BTCUSDT', 'ETHUSDT', ...])
@@ -48,10 +74,10 @@ def get_top_market_cap():
             'page': 1,
         }
 
-        response = requests.get(COINGECKO_API_URL, params=params)
-        response.raise_for_status()  # Raise exception for bad status codes
-
-        data = response.json()
+        async with get_session().get(COINGECKO_API_URL,
+                                     params=params) as response:
+            response.raise_for_status()  # Raise exception for bad status codes
+            data = await response.json(loads=orjson.loads)
 
         # Filter out stablecoins and get top N
         non_stablecoin_symbols = []
@@ -63,7 +89,7 @@ def get_top_market_cap():
 
         return non_stablecoin_symbols[:TOP_N_MARKETCAP]
 
-    except requests.exceptions.RequestException as e:
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         print(f"Error fetching market cap data from CoinGecko: {e}",
               flush=True)
         return []
@@ -72,8 +98,16 @@ def get_top_market_cap():
         return []
 
 
+def cache_top_market_cap(symbols, age=0):
+    """Keep the top market cap symbols in memory until they go stale"""
+    global top_market_cap_cache
+    top_market_cap_cache = (frozenset(symbols), time.monotonic() +
+                            MARKETCAP_UPDATE_INTERVAL - age)
+
+
 def save_top_market_cap(symbols):
     """Save the top market cap symbols to a JSON file with timestamp"""
+    cache_top_market_cap(symbols)
     data = {'timestamp': int(time.time()), 'symbols': symbols}
     try:
         with open(MARKET_CAP_FILE, 'w') as f:
@@ -95,25 +129,32 @@ def load_top_market_cap():
             data = json.load(f)
 
         # Check if data is stale (older than MARKETCAP_UPDATE_INTERVAL)
-        if int(time.time()) - data['timestamp'] > MARKETCAP_UPDATE_INTERVAL:
+        age = int(time.time()) - data['timestamp']
+        if age > MARKETCAP_UPDATE_INTERVAL:
             return None
 
+        cache_top_market_cap(data['symbols'], age)
         return data['symbols']
     except Exception as e:
         print(f"Error loading market cap data: {e}", flush=True)
         return None
 
 
-def is_top_market_cap(symbol):
+async def is_top_market_cap(symbol):
     """
     Check if a symbol is in the top market cap list
     Returns True if the symbol is in the top N market cap list
     """
+    # Serve from memory while fresh, without touching the file or network
+    if (top_market_cap_cache is not None
+            and time.monotonic() < top_market_cap_cache[1]):
+        return symbol in top_market_cap_cache[0]
+
     symbols = load_top_market_cap()
 
     # If no cached data or data is stale, fetch new data
     if symbols is None:
-        symbols = get_top_market_cap()
+        symbols = await get_top_market_cap()
         if symbols:  # Only save if we successfully got data
             save_top_market_cap(symbols)
 
@@ -125,7 +166,7 @@ async def update_market_cap_loop():
     while True:
         try:
             print("\nUpdating top market cap data...", flush=True)
-            symbols = get_top_market_cap()
+            symbols = await get_top_market_cap()
             if symbols:
                 save_top_market_cap(symbols)
                 print(f"Top {TOP_N_MARKETCAP} market cap symbols: {symbols}\n",
@@ -138,14 +179,21 @@ async def update_market_cap_loop():
         await asyncio.sleep(MARKETCAP_UPDATE_INTERVAL)
 
 
-# Initialize the market cap data on module load
-if __name__ == "__main__":
+async def main():
     print("Initializing market cap tracker...\n", flush=True)
-    symbols = get_top_market_cap()
+    symbols = await get_top_market_cap()
     if symbols:
         save_top_market_cap(symbols)
         print(f"Initial top {TOP_N_MARKETCAP} market cap symbols: {symbols}\n",
               flush=True)
 
     # Run the update loop
-    asyncio.run(update_market_cap_loop())
+    try:
+        await update_market_cap_loop()
+    finally:
+        await close_session()
+
+
+# Initialize the market cap data on module load
+if __name__ == "__main__":
+    asyncio.run(main())
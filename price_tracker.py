@@ -0,0 +1,105 @@
+import asyncio
+import itertools
+import aiohttp
+import orjson
+
+# Constants
+COMBINED_STREAM_URL = "wss://fstream.binance.com/stream"
+RECONNECT_DELAY = 5  # seconds
+
+# Last traded price of each watched symbol, the same price the REST ticker
+# returns. A symbol's entry stays current for as long as it is subscribed,
+# however rarely it trades, so it is cleared on unsubscribe and disconnect
+latest_prices = {}
+watched_symbols = set()
+stream_ws = None  # open websocket, None while disconnected
+request_ids = itertools.count(1)
+subscription_tasks = set()
+
+
+def get_cached_price(symbol):
+    """
+    Return the last streamed trade price of a watched symbol, or None if no
+    trade has come in since it was subscribed
+    """
+    return latest_prices.get(symbol)
+
+
+def stream_name(symbol):
+    return f"{symbol.lower()}@aggTrade"
+
+
+async def send_subscription(method, symbols):
+    """Send a SUBSCRIBE or UNSUBSCRIBE request for symbols' trade streams"""
+    if stream_ws is None or not symbols:
+        return
+    request = {
+        "method": method,
+        "params": [stream_name(symbol) for symbol in symbols],
+        "id": next(request_ids),
+    }
+    try:
+        await stream_ws.send_str(orjson.dumps(request).decode())
+    except Exception as e:
+        print(f"Failed to {method.lower()} price stream for {symbols}: {e}",
+              flush=True)
+
+
+def update_subscription(method, symbol):
+    # While disconnected, price_stream_loop() subscribes on reconnect
+    if stream_ws is None:
+        return
+    task = asyncio.create_task(send_subscription(method, [symbol]))
+    subscription_tasks.add(task)
+    task.add_done_callback(subscription_tasks.discard)
+
+
+def watch_symbol(symbol):
+    """Start streaming a symbol's trade price (e.g. while it has a trade)"""
+    if symbol not in watched_symbols:
+        watched_symbols.add(symbol)
+        update_subscription("SUBSCRIBE", symbol)
+
+
+def unwatch_symbol(symbol):
+    """Stop streaming a symbol's trade price"""
+    if symbol in watched_symbols:
+        watched_symbols.discard(symbol)
+        latest_prices.pop(symbol, None)
+        update_subscription("UNSUBSCRIBE", symbol)
+
+
+async def price_stream_loop():
+    """
+    Background task keeping latest_prices updated for the watched symbols
+    from Binance futures
+    """
+    global stream_ws
+    while True:
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.ws_connect(COMBINED_STREAM_URL,
+                                              heartbeat=30) as ws:
+                    stream_ws = ws
+                    print("Connected to Binance price stream\n", flush=True)
+                    await send_subscription("SUBSCRIBE",
+                                            sorted(watched_symbols))
+                    async for msg in ws:
+                        if msg.type != aiohttp.WSMsgType.TEXT:
+                            break
+                        # Subscription replies carry no "data"
+                        data = orjson.loads(msg.data).get("data")
+                        if data and data.get("s") in watched_symbols:
+                            latest_prices[data["s"]] = float(data["p"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error in price stream: {e}", flush=True)
+        finally:
+            stream_ws = None
+            latest_prices.clear()
+
+        print(f"Price stream closed, reconnecting in "
+              f"{RECONNECT_DELAY}s...\n",
+              flush=True)
+        await asyncio.sleep(RECONNECT_DELAY)
@@ -1,22 +1,32 @@
 import os
+import sys
 import time
+import logging
+import logging.handlers
+import queue
 import signal
 import math
+import random
 import re
-import telebot
+import functools
+import heapq
+import itertools
+import uuid
+import io
 import aiohttp
 import asyncio
 import textwrap
-import json
+import orjson
 import aiofiles
-import prettytable as pt
+import aiofiles.os
 from typing import List
 from pydantic import BaseModel
 import instructor
-from pyrogram import Client, utils, filters, idle
+from pyrogram import Client, utils, filters
 from aiogram import Bot, Dispatcher, Router, html
 from aiogram.utils import markdown as ParseMode
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.enums import ParseMode
 from aiogram.filters import CommandStart, Command
 from aiogram.types import Message, BotCommand
@@ -29,20 +39,54 @@ from config import (TELEGRAM_API_KEY, TELEGRAM_HASH, CHAT_ID_LIST,
                     BINANCE_TESTNET_API_SECRET, BINANCE_MAINNET_API_KEY,
                     BINANCE_MAINNET_API_SECRET, BINANCE_MAINNET_FLAG,
                     LLM_OPTION, GEMINI_API_KEY, OPENAI_API_KEY, TELEGRAM_BOT_TOKEN,
-                    NUM_WORKERS, ENV, TOP_N_MARKETCAP, PROVIDER_MODEL)
+                    NUM_WORKERS, ENV, TOP_N_MARKETCAP, PROVIDER_MODEL,
+                    LLM_CONCURRENCY, FORWARD_BATCH_INTERVAL,
+                    MAX_PENDING_MESSAGES, BREAKER_FAILURE_THRESHOLD,
+                    BREAKER_SLEEP_WINDOW, MAX_BACKOFF, MAX_INFLIGHT,
+                    API_TIMEOUT, MIN_WORKERS, WORKER_SCALE_INTERVAL,
+                    BINANCE_WEIGHT_LIMIT, EXIT_RETRY_DELAY,
+                    EXIT_MAX_RETRIES)
 import urllib3
-from market_cap_tracker import is_top_market_cap, update_market_cap_loop
+from requests.adapters import HTTPAdapter
+from market_cap_tracker import (is_top_market_cap, update_market_cap_loop,
+                                close_session as close_market_cap_session)
+from price_tracker import (get_cached_price, price_stream_loop, watch_symbol,
+                           unwatch_symbol)
+from trade_sides import (ENTRY_ORDER_SIDE, EXIT_ORDER_SIDE,
+                         calculate_final_capital)
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# [Logging] Logger for the message and trade pipelines (messages are
+# formatted lazily, so DEBUG output such as full message text costs nothing
+# at INFO level). Records are handed to a queue and written to stdout by a
+# listener thread, so workers never block the event loop on console I/O
+logger = logging.getLogger("cryptopulse")
+logger.setLevel(logging.INFO)
+log_queue = queue.SimpleQueue()
+logger.addHandler(logging.handlers.QueueHandler(log_queue))
+logger.propagate = False
+log_handler = logging.StreamHandler(sys.stdout)
+log_handler.setFormatter(logging.Formatter("%(message)s"))
+log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+log_listener.start()
+
 # [Binance] Client
 try:
     if BINANCE_MAINNET_FLAG:
-        client = binance.client.Client(BINANCE_MAINNET_API_KEY,
-                                       BINANCE_MAINNET_API_SECRET,
-                                       testnet=False)
+        client = binance.client.Client(
+            BINANCE_MAINNET_API_KEY,
+            BINANCE_MAINNET_API_SECRET,
+            requests_params={"timeout": API_TIMEOUT},
+            testnet=False)
     else:
-        client = binance.client.Client()
+        client = binance.client.Client(
+            requests_params={"timeout": API_TIMEOUT})
+
+    # One pooled connection per in-flight call, so threaded calls don't
+    # queue on (or discard) the default 10-connection pool
+    client.session.mount(
+        "https://", HTTPAdapter(pool_connections=4, pool_maxsize=MAX_INFLIGHT))
 
     if ENV == 'dev':
         client.session.verify = False
@@ -54,32 +98,143 @@ except Exception as e:
     client = None
 
 
-# [Binance] Retry logic
+# [Binance] Circuit breaker so an outage fails fast instead of every trade
+# sleeping through all of its retries
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "CLOSED", "OPEN", "HALF_OPEN"
+
+    def __init__(self, failure_threshold, sleep_window):
+        self.failure_threshold = failure_threshold
+        self.sleep_window = sleep_window
+        self.state = self.CLOSED
+        self.failures = 0
+        self.last_open_ts = 0.0
+        self.probe_in_flight = False
+
+    def allow_request(self):
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if time.monotonic() - self.last_open_ts < self.sleep_window:
+                return False
+            self.state = self.HALF_OPEN
+        # HALF_OPEN: admit a single probe call
+        if self.probe_in_flight:
+            return False
+        self.probe_in_flight = True
+        return True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.probe_in_flight = False
+        if (self.state == self.HALF_OPEN
+                or self.failures >= self.failure_threshold):
+            if self.state != self.OPEN:
+                logger.info("Circuit breaker opened after %d failures.",
+                            self.failures)
+            self.state = self.OPEN
+            self.last_open_ts = time.monotonic()
+
+
+breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_SLEEP_WINDOW)
+# Bulkhead: caps Binance calls in flight independently of NUM_WORKERS
+api_semaphore = asyncio.Semaphore(MAX_INFLIGHT)
+
+
+NON_RETRYABLE_ERROR_CODES = {
+    -1111,  # Precision is over the maximum defined for this asset
+    -1112,  # Invalid order
+    -2013,  # Order does not exist
+    -2019,  # Invalid quantity
+    -2021,  # Order would immediately trigger
+    -2022,  # ReduceOnly order rejected (e.g. the position is already closed)
+}
+
+
+# Record a failed Binance call and return whether it is worth retrying
+def handle_api_error(e, attempt, retries):
+    if isinstance(e, BinanceAPIException):
+        error_code = getattr(e, 'code', None)
+        if error_code in NON_RETRYABLE_ERROR_CODES:
+            # The request was rejected, but the API itself is healthy
+            breaker.record_success()
+            logger.info("Binance API Error (code=%s): %s. Not retrying.",
+                        error_code, e)
+            return False
+        breaker.record_failure()
+        logger.info("Binance API Error: %s. Retrying... (%d/%d)", e,
+                    attempt + 1, retries)
+    elif isinstance(e, asyncio.TimeoutError):
+        breaker.record_failure()
+        logger.info("Binance API call timed out after %ss. Retrying... (%d/%d)",
+                    API_TIMEOUT, attempt + 1, retries)
+    else:
+        breaker.record_failure()
+        logger.info("Unexpected error: %s. Retrying... (%d/%d)", e,
+                    attempt + 1, retries)
+    return True
+
+
+# Exponential backoff schedule, computed once rather than on every failure
+BACKOFF_DELAYS = tuple(
+    min(MAX_BACKOFF, (RETRY_AFTER or 2) * 2**attempt)
+    for attempt in range(MAX_RETRIES or 3))
+
+
+def get_backoff(attempt):
+    # Jitter so workers don't retry in lock-step
+    return BACKOFF_DELAYS[attempt] * random.uniform(0.5, 1.5)
+
+
+# Blocking retry, only used during start-up before the event loop runs
 def retry_api_call(func, *args, **kwargs):
     retries = MAX_RETRIES or 3
-    delay = RETRY_AFTER or 2
+    last_attempt = retries - 1
+    for attempt in range(retries):
+        if not breaker.allow_request():
+            logger.info("Circuit breaker is open. Skipping Binance API call.")
+            return None
+        try:
+            result = func(*args, **kwargs)
+            breaker.record_success()
+            return result
+        except Exception as e:
+            if not handle_api_error(e, attempt, retries):
+                return None
+        if attempt < last_attempt:
+            time.sleep(get_backoff(attempt))
+    logger.info("Max retries (%d) reached. Operation failed.", retries)
+    return None
 
-    non_retryable_error_codes = {
-        -1111,  # Precision is over the maximum defined for this asset
-        -1112,  # Invalid order
-        -2013,  # No sufficient funds
-        -2019,  # Invalid quantity
-        -2021,  # Order would immediately trigger
-    }
 
+# Runs the blocking client call in a thread and waits without blocking the
+# event loop, so other trades keep going while one is retrying
+async def async_retry_api_call(func, *args, **kwargs):
+    retries = MAX_RETRIES or 3
+    last_attempt = retries - 1
     for attempt in range(retries):
+        if not breaker.allow_request():
+            logger.info("Circuit breaker is open. Skipping Binance API call.")
+            return None
         try:
-            return func(*args, **kwargs)
-        except BinanceAPIException as e:
-            error_code = getattr(e, 'code', None)
-            if error_code in non_retryable_error_codes:
-                print(f"Binance API Error (code={error_code}): {e}. Not retrying.", flush=True)
-                return None
-            print(f"Binance API Error: {e}. Retrying... ({attempt + 1}/{retries})", flush=True)
+            async with api_semaphore:
+                # Don't let a hung socket hold the worker indefinitely
+                result = await asyncio.wait_for(
+                    asyncio.to_thread(func, *args, **kwargs),
+                    timeout=API_TIMEOUT)
+            breaker.record_success()
+            return result
         except Exception as e:
-            print(f"Unexpected error: {e}. Retrying... ({attempt + 1}/{retries})", flush=True)
-        time.sleep(delay)
-    print(f"Max retries ({retries}) reached. Operation failed.", flush=True)
+            if not handle_api_error(e, attempt, retries):
+                return None
+        if attempt < last_attempt:
+            await asyncio.sleep(get_backoff(attempt))
+    logger.info("Max retries (%d) reached. Operation failed.", retries)
     return None
 
 
@@ -135,65 +290,190 @@ else:
         if 'USDT' in symbol['symbol'] and symbol['status'] == 'TRADING'
     ]
 
-symbol_queue = asyncio.Queue()
-processing_symbols = set()
-pending_symbols = set()
+# Bounded so a burst of signals applies backpressure instead of piling up
+symbol_queue = asyncio.Queue(maxsize=NUM_WORKERS * 2)
+NOTIONAL = INITIAL_CAPITAL * LEVERAGE  # order size in USDT
+# Symbols with a trade queued or running: {symbol: PENDING or PROCESSING}
+PENDING, PROCESSING = 0, 1
+in_flight = {}
+
+
+# Claim a symbol for a trade and stream its price until the trade is done
+def claim_symbol(symbol):
+    in_flight[symbol] = PENDING
+    watch_symbol(symbol)
+
+
+def release_symbol(symbol):
+    in_flight.pop(symbol, None)
+    unwatch_symbol(symbol)
 
 
 # [Binance] Get ticker price with retry logic
-def get_price(symbol):
-    return retry_api_call(client.futures_symbol_ticker, symbol=symbol)
+async def get_price(symbol):
+    return await async_retry_api_call(client.futures_symbol_ticker, symbol=symbol)
+
+
+# [Binance] Get ticker price from the trade stream of a claimed symbol,
+# falling back to REST (retried on mainnet, fetched once on testnet) until
+# the stream has a trade for it
+async def fetch_ticker(symbol):
+    price = get_cached_price(symbol)
+    if price is not None:
+        return {"symbol": symbol, "price": price}
+    if BINANCE_MAINNET_FLAG:
+        return await get_price(symbol)
+    try:
+        # Counted against the same bulkhead as the retried calls
+        async with api_semaphore:
+            return await asyncio.wait_for(
+                asyncio.to_thread(client.futures_symbol_ticker, symbol=symbol),
+                timeout=API_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.info("Timed out getting ticker price for %s", symbol)
+    except BinanceAPIException as e:
+        logger.info("Failed to get ticker price for %s: %s", symbol, e)
+    except Exception as e:
+        logger.info("Unexpected error getting ticker price for %s: %s",
+                    symbol, e)
+    return None
 
 
 # [Binance] Set leverage
-def change_leverage(symbol, leverage):
-    retry_api_call(client.futures_change_leverage,
-                   symbol=symbol,
-                   leverage=leverage)
+async def change_leverage(symbol, leverage):
+    await async_retry_api_call(client.futures_change_leverage,
+                               symbol=symbol,
+                               leverage=leverage)
+
+
+# [Binance] Client order IDs let a failed order be looked up on the
+# exchange, so it is never sent twice
+ORDER_DOES_NOT_EXIST = -2013
+
+
+def new_client_order_id():
+    return f"cryptopulse-{uuid.uuid4().hex[:20]}"
+
+
+# [Binance] Look up an order by its client order ID. Returns the order, False
+# if the exchange confirms it does not exist, or None if that is unknown
+async def find_order(symbol, client_order_id):
+    try:
+        async with api_semaphore:
+            return await asyncio.to_thread(client.futures_get_order,
+                                           symbol=symbol,
+                                           origClientOrderId=client_order_id)
+    except BinanceAPIException as e:
+        if getattr(e, 'code', None) == ORDER_DOES_NOT_EXIST:
+            return False
+        logger.info("Failed to look up order %s: %s", client_order_id, e)
+    except Exception as e:
+        logger.info("Unexpected error looking up order %s: %s",
+                    client_order_id, e)
+    return None
+
 
+# [Binance] Place market order ("BUY" or "SELL"). Creating an order is not
+# idempotent: a request that failed (e.g. timed out) may still have been
+# accepted, so it is only sent again once the exchange confirms that the
+# order does not exist. Pass resume=True with the client_order_id of an
+# earlier attempt to pick that order up rather than place a new one. Returns
+# the order, False if the exchange rejected it (not worth retrying), or None
+# if it failed otherwise
+async def place_market_order(symbol, side, order_size, client_order_id=None,
+                             resume=False, reduce_only=False):
+    # A reduce-only order can only shrink a position, so an exit can never
+    # open a new one if the position was already closed
+    extra_params = {"reduceOnly": "true"} if reduce_only else {}
+    if client_order_id is None:
+        client_order_id = new_client_order_id()
+    elif resume:
+        existing = await find_order(symbol, client_order_id)
+        if existing is not False:
+            return existing
 
-# [Binance] Place market buy order with retry logic
-def place_buy_order(symbol, order_size):
-    return retry_api_call(client.futures_create_order,
-                          symbol=symbol,
-                          side="BUY",
-                          type="MARKET",
-                          quantity=order_size)
+    retries = MAX_RETRIES or 3
+    for attempt in range(retries):
+        if not breaker.allow_request():
+            logger.info("Circuit breaker is open. Skipping Binance API call.")
+            return None
+        try:
+            async with api_semaphore:
+                # Bounded by the session's requests timeout rather than
+                # wait_for, which would leave the request running in its
+                # thread and racing the lookup below
+                result = await asyncio.to_thread(
+                    client.futures_create_order,
+                    symbol=symbol,
+                    side=side,
+                    type="MARKET",
+                    quantity=order_size,
+                    newClientOrderId=client_order_id,
+                    **extra_params)
+            breaker.record_success()
+            return result
+        except Exception as e:
+            if not handle_api_error(e, attempt, retries):
+                return False
+
+        # Give the exchange a moment, then check whether the failed request
+        # was accepted before sending the order again
+        await asyncio.sleep(get_backoff(attempt))
+        existing = await find_order(symbol, client_order_id)
+        if existing:
+            logger.info("Order %s was placed despite the error, not resending",
+                        client_order_id)
+            return existing
+        if existing is None:
+            logger.info("Could not confirm whether order %s was placed, "
+                        "not resending", client_order_id)
+            return None
+    logger.info("Max retries (%d) reached. Operation failed.", retries)
+    return None
 
 
-# [Binance] Place market sell order with retry logic
-def place_sell_order(symbol, order_size):
-    return retry_api_call(client.futures_create_order,
-                          symbol=symbol,
-                          side="SELL",
-                          type="MARKET",
-                          quantity=order_size)
+# [Binance] Order labels for each trade direction (e.g. "Buy" for a LONG entry)
+ENTRY_SIDE = {d: side.capitalize() for d, side in ENTRY_ORDER_SIDE.items()}
+EXIT_SIDE = {d: side.capitalize() for d, side in EXIT_ORDER_SIDE.items()}
 
 
 # [Binance] Get order with retry logic
-def get_order(symbol, order):
-    return retry_api_call(client.futures_get_order,
-                          symbol=symbol,
-                          orderId=order["orderId"])
+async def get_order(symbol, order):
+    return await async_retry_api_call(client.futures_get_order,
+                                      symbol=symbol,
+                                      orderId=order["orderId"])
+
+
+# [Binance] Average fill price of a placed order, or None if neither the
+# order lookup nor the order response has one
+async def get_fill_price(symbol, order):
+    for info in (await get_order(symbol, order), order):
+        try:
+            avg_price = float(info["avgPrice"])
+        except (TypeError, KeyError, ValueError):
+            continue
+        if avg_price > 0:
+            return avg_price
+    return None
 
 
 # [Binance] Get futures account trades with retry logic
-def get_account_trades(symbol):
-    return retry_api_call(client.futures_account_trades, symbol=symbol)
+async def get_account_trades(symbol):
+    return await async_retry_api_call(client.futures_account_trades, symbol=symbol)
 
 
 # [Binance] Get futures account with retry logic
-def get_account():
-    return retry_api_call(client.futures_account)
+async def get_account():
+    return await async_retry_api_call(client.futures_account)
 
 
-def wait_for_trades(symbol, order_id, timeout=5):
+async def wait_for_trades(symbol, order_id, timeout=5):
     for _ in range(timeout * 5):  # poll every 0.2s
-        trades = get_account_trades(symbol)
+        trades = await get_account_trades(symbol) or []
         order_trades = [t for t in trades if t["orderId"] == order_id]
         if order_trades:
             return order_trades
-        time.sleep(0.2)
+        await asyncio.sleep(0.2)
     return []  # timeout
 
 
@@ -232,315 +512,517 @@ def calculate_order_size(order_size: float, filters: dict, price: float) -> floa
     return adjusted_size
 
 
+# [Telegram] Trade replies go through an outbox drained by one sender task,
+# so workers never wait on a Telegram round trip
+tg_outbox = asyncio.Queue()
+OUTBOX_DRAIN_TIMEOUT = 10  # seconds to keep sending queued replies on shutdown
+
+
+def send_trade_reply(message, text):
+    tg_outbox.put_nowait((message, text))
+
+
+async def tg_outbox_sender():
+    while True:
+        # Take everything that is waiting, not just one reply
+        batch = [await tg_outbox.get()]
+        while not tg_outbox.empty():
+            batch.append(tg_outbox.get_nowait())
+
+        # Coalesce consecutive replies to the same message into one
+        groups = []
+        for message, text in batch:
+            if groups and groups[-1][0] is message:
+                groups[-1][1].append(text)
+            else:
+                groups.append((message, [text]))
+
+        for message, texts in groups:
+            try:
+                await message.reply_text("\n\n".join(texts), quote=True)
+            except Exception as e:
+                logger.warning("Failed to send trade reply: %s", e)
+
+        for _ in batch:
+            tg_outbox.task_done()
+
+
+# [Binance] Telegram summary of a completed trade
+TRADE_RESULT_TEMPLATE = (
+    "🚀 **{direction} Trade Simulated** 🚀\n"
+    "\n"
+    "**Trading Parameters:**\n"
+    "__Symbol:__ {symbol}  \n"
+    "__Order Size (in USDT):__ ${notional:,.2f}  \n"
+    "\n"
+    "**Market {entry_side} Order Executed:**  \n"
+    "{order_size:,.2f} {base_symbol} at ${price}  \n"
+    "\n"
+    "**Market {exit_side} Order Executed {hodl_mins:,.2f} mins later:**  \n"
+    "{order_size:,.2f} {base_symbol} at ${new_price}  \n"
+    "\n"
+    "**Trade Summary:**  \n"
+    "__Before Capital:__ ${before_capital:.2f}  \n"
+    "__After Capital:__ ${after_capital:.2f} ({percentage_gained:+.2f}%)\n"
+    "{pnl_line}\n"
+    "__Total Time Taken:__ {time_taken:.2f} seconds\n")
+
+
+# [Binance] Base asset of a USDT symbol (e.g. "BTCUSDT" -> "BTC"), the same
+# few symbols dominate the signals so results are cached
+@functools.lru_cache(maxsize=256)
+def get_base_symbol(symbol):
+    return symbol.removesuffix("USDT")
+
+
 # [Binance] Function to simulate a trading operation for a single ticker
 async def trade(symbol, direction, message, original_chat_id, start_time):
+    opened = False
     try:
-        base_symbol = symbol.replace("USDT", "")
+        base_symbol = get_base_symbol(symbol)
 
-        print(f"\nTrading Parameters:")
-        print(f"----------------------------------", flush=True)
-        print(f"Symbol: {symbol}", flush=True)
+        logger.info("\nTrading Parameters:\n"
+                    "----------------------------------\n"
+                    "Symbol: %s", symbol)
 
         if not client:
             error_msg = "Binance client is not initialized. Cannot execute trade."
-            print(error_msg, flush=True)
-            await message.reply_text(error_msg, quote=True)
+            logger.info(error_msg)
+            send_trade_reply(message, error_msg)
             return
 
         if BINANCE_MAINNET_FLAG:
             symbol_filters = perps_tokens.get(symbol)
             if symbol_filters is None:
                 error_msg = f"Could not find filters for symbol {symbol}"
-                print(error_msg, flush=True)
-                await message.reply_text(error_msg, quote=True)
+                logger.info(error_msg)
+                send_trade_reply(message, error_msg)
                 return
 
-            print(
-                f"Symbol stepSize: {symbol_filters.get('stepSize')}, "
-                f"minQty: {symbol_filters.get('minQty')}, "
-                f"maxQty: {symbol_filters.get('maxQty')}, "
-                f"minNotional: ${symbol_filters.get('minNotional')}",
-                flush=True)
-            # Get ticker's price
-            ticker = get_price(symbol)
-        else:
-            try:
-                # Get ticker's price
-                ticker = client.futures_symbol_ticker(symbol=symbol)
-            except BinanceAPIException as e:
-                error_msg = f"Failed to get ticker price for {symbol}: {e}"
-                print(error_msg, flush=True)
-                await message.reply_text(error_msg, quote=True)
-                return
-            except Exception as e:
-                error_msg = f"Unexpected error getting ticker price for {symbol}: {e}"
-                print(error_msg, flush=True)
-                await message.reply_text(error_msg, quote=True)
-                return
+            logger.info(
+                "Symbol stepSize: %s, minQty: %s, maxQty: %s, minNotional: $%s",
+                symbol_filters.get('stepSize'), symbol_filters.get('minQty'),
+                symbol_filters.get('maxQty'),
+                symbol_filters.get('minNotional'))
 
+        # Get ticker's price
+        ticker = await fetch_ticker(symbol)
         if not ticker:
             error_msg = f"Failed to get ticker data for {symbol}"
-            print(error_msg, flush=True)
-            await message.reply_text(error_msg, quote=True)
+            logger.info(error_msg)
+            send_trade_reply(message, error_msg)
             return
 
-        print(f"Initial Capital (Margin): ${INITIAL_CAPITAL:,.2f}", flush=True)
-        print(f"Leverage: {LEVERAGE}x", flush=True)
-        print(f"Order Size (in USDT): ${INITIAL_CAPITAL * LEVERAGE:,.2f}",
-              flush=True)
+        logger.info("Initial Capital (Margin): $%.2f\n"
+                    "Leverage: %sx\n"
+                    "Order Size (in USDT): $%.2f",
+                    INITIAL_CAPITAL, LEVERAGE, NOTIONAL)
 
         try:
             price = float(ticker["price"])
         except (KeyError, ValueError) as e:
             error_msg = f"Invalid ticker data for {symbol}: {e}"
-            print(error_msg, flush=True)
-            await message.reply_text(error_msg, quote=True)
+            logger.info(error_msg)
+            send_trade_reply(message, error_msg)
             return
 
         # Calculate order size
         try:
-            order_size = (INITIAL_CAPITAL * LEVERAGE) / price
+            order_size = NOTIONAL / price
             if BINANCE_MAINNET_FLAG and symbol_filters:
-                change_leverage(symbol, LEVERAGE)
+                await change_leverage(symbol, LEVERAGE)
                 order_size = calculate_order_size(order_size, symbol_filters, price)
                 corrected_initial_capital = (order_size * price) / LEVERAGE
             else:
                 corrected_initial_capital = INITIAL_CAPITAL
         except ValueError as e:
             error_msg = f"Error calculating order size: {e}"
-            print(error_msg, flush=True)
-            await message.reply_text(error_msg, quote=True)
+            logger.info(error_msg)
+            send_trade_reply(message, error_msg)
             return
         except Exception as e:
             error_msg = f"Unexpected error calculating order size: {e}"
-            print(error_msg, flush=True)
-            await message.reply_text(error_msg, quote=True)
+            logger.info(error_msg)
+            send_trade_reply(message, error_msg)
             return
 
-        print(f"Order Size (in {base_symbol}): {order_size:,.2f}", flush=True)
-        print(f"----------------------------------\n", flush=True)
+        logger.info("Order Size (in %s): %.2f\n"
+                    "----------------------------------\n",
+                    base_symbol, order_size)
 
         try:
             if BINANCE_MAINNET_FLAG:
                 # Check available balance before placing order
-                account = get_account()
+                account = await get_account()
                 if not account:
                     error_msg = "Failed to get account information"
-                    print(error_msg, flush=True)
-                    await message.reply_text(error_msg, quote=True)
+                    logger.info(error_msg)
+                    send_trade_reply(message, error_msg)
                     return
 
                 available_balance = float(account.get("availableBalance", 0))
                 if available_balance <= 0:
                     error_msg = "No available balance for trading"
-                    print(error_msg, flush=True)
-                    await message.reply_text(error_msg, quote=True)
+                    logger.info(error_msg)
+                    send_trade_reply(message, error_msg)
                     return
 
                 max_allowed_capital = available_balance * 0.5  # 50% of available balance
                 if corrected_initial_capital > max_allowed_capital:
                     error_msg = f"Order size (${corrected_initial_capital:,.2f}) exceeds 50% of available balance (${max_allowed_capital:,.2f})"
-                    print(error_msg, flush=True)
-                    await message.reply_text(error_msg, quote=True)
+                    logger.info(error_msg)
+                    send_trade_reply(message, error_msg)
                     return
 
-                print(f"Available Balance: ${available_balance:,.2f}",
-                      flush=True)
-                print(
-                    f"Maximum Allowed Capital (50%): ${max_allowed_capital:,.2f}",
-                    flush=True)
+                logger.info(
+                    "Available Balance: $%.2f\n"
+                    "Maximum Allowed Capital (50%%): $%.2f",
+                    available_balance, max_allowed_capital)
 
-            buy_order = place_buy_order(
-                symbol, order_size) if BINANCE_MAINNET_FLAG else True
+            entry_order = await place_market_order(
+                symbol, ENTRY_ORDER_SIDE[direction],
+                order_size) if BINANCE_MAINNET_FLAG else True
 
             if BINANCE_MAINNET_FLAG:
-                if buy_order is None:
-                    error_msg = f"Buy order failed for {symbol} after {MAX_RETRIES} retries"
-                    print(error_msg + "\n", flush=True)
-                    await message.reply_text(error_msg, quote=True)
+                if not entry_order:
+                    error_msg = f"{ENTRY_SIDE[direction]} order failed for {symbol}"
+                    logger.info("%s\n", error_msg)
+                    send_trade_reply(message, error_msg)
                     return
-                order_info = get_order(symbol, buy_order)
-                price = float(order_info["avgPrice"])
-
-            if buy_order:
-                print(
-                    f"Market {'Buy' if direction == 'LONG' else 'Sell'} Order Executed: {order_size:,.2f} {base_symbol} at ${price}\n",
-                    flush=True)
-
-                await asyncio.sleep(HODL_TIME)  # Simulate holding the position
-                print(f"\nHodling for {HODL_TIME} seconds...\n", flush=True)
-
-                sell_order = place_sell_order(
-                    symbol, order_size) if BINANCE_MAINNET_FLAG else True
-
-                realised_pnl = 0
-                if BINANCE_MAINNET_FLAG:
-                    if sell_order is None:
-                        error_msg = f"Sell order failed for {symbol} after {MAX_RETRIES} retries"
-                        print(error_msg + "\n", flush=True)
-                        await message.reply_text(error_msg, quote=True)
-                        return
-                    order_info = get_order(symbol, sell_order)
-                    new_price = float(order_info["avgPrice"])
-
-                    trades = wait_for_trades(symbol, sell_order["orderId"])
-                    realised_pnl = sum(float(t["realizedPnl"]) for t in trades)
-                else:
-                    ticker = client.futures_symbol_ticker(symbol=symbol)
-
-                    if not ticker:
-                        error_msg = f"Failed to get updated ticker data for {symbol}"
-                        print(error_msg, flush=True)
-                        await message.reply_text(error_msg, quote=True)
-                        return
-
-                    try:
-                        new_price = float(ticker["price"])
-                    except (KeyError, ValueError) as e:
-                        error_msg = f"Invalid updated ticker data for {symbol}: {e}"
-                        print(error_msg, flush=True)
-                        await message.reply_text(error_msg, quote=True)
-                        return
-
-                if sell_order:
-                    print(
-                        f"Market {'Sell' if direction == 'LONG' else 'Buy'} Order Executed: {order_size:,.2f} {base_symbol} at ${new_price}\n",
-                        flush=True)
-
-                    if direction == 'LONG':
-                        final_capital = corrected_initial_capital + (
-                            (new_price - price) * order_size)
-                    else:
-                        final_capital = corrected_initial_capital - (
-                            (new_price - price) * order_size)
-                    percentage_gained = (
-                        (final_capital - corrected_initial_capital) /
-                        corrected_initial_capital) * 100
-
-                    print(f"Trade Summary:", flush=True)
-                    print(f"----------------------------------", flush=True)
-                    print(f"Before Capital: ${corrected_initial_capital:.2f}",
-                          flush=True)
-                    print(
-                        f"After Capital: ${final_capital:.2f} ({percentage_gained:+.2f}%)",
-                        flush=True)
-                    if BINANCE_MAINNET_FLAG:
-                        print(f"Realised PNL: ${realised_pnl:.2f}", flush=True)
-                    print(f"----------------------------------\n", flush=True)
-
-                    content = textwrap.dedent(f"""\
-                    🚀 **{direction} Trade Simulated** 🚀
-
-                    **Trading Parameters:**
-                    __Symbol:__ {symbol}  
-                    __Order Size (in USDT):__ ${INITIAL_CAPITAL * LEVERAGE:,.2f}  
-
-                    **Market {'Buy' if direction == 'LONG' else 'Sell'} Order Executed:**  
-                    {order_size:,.2f} {base_symbol} at ${price}  
-
-                    **Market {'Sell' if direction == 'LONG' else 'Buy'} Order Executed {HODL_TIME / 60:,.2f} mins later:**  
-                    {order_size:,.2f} {base_symbol} at ${new_price}  
-
-                    **Trade Summary:**  
-                    __Before Capital:__ ${corrected_initial_capital:.2f}  
-                    __After Capital:__ ${final_capital:.2f} ({percentage_gained:+.2f}%)
-                    {f"__Realised PNL:__ ${realised_pnl:.2f} USD" if BINANCE_MAINNET_FLAG else f"__PNL:__ ${final_capital - corrected_initial_capital:.2f} USD"}
-                    __Total Time Taken:__ {time.time() - start_time:.2f} seconds
-                    """)
-
-                    pnl = final_capital - corrected_initial_capital
-
-                    new_pnl_data = {str(original_chat_id): pnl}
-
-                    await update_pnl_data(new_pnl_data)
-                    await update_stats_data(pnl)
-                    await message.reply_text(content, quote=True)
+                # The position is open from here on, so a failed lookup
+                # must not stop its exit from being scheduled
+                fill_price = await get_fill_price(symbol, entry_order)
+                if fill_price is None:
+                    logger.warning(
+                        "Could not get the fill price of %s, using the ticker price $%s",
+                        symbol, price)
                 else:
-                    error_msg = f"Sell order failed for {symbol}"
-                    print(error_msg + "\n", flush=True)
-                    await message.reply_text(error_msg, quote=True)
+                    price = fill_price
+
+            if entry_order:
+                logger.info("Market %s Order Executed: %.2f %s at $%s\n",
+                            ENTRY_SIDE[direction], order_size, base_symbol,
+                            price)
+
+                # Release the worker while holding, the exit timer queues
+                # the close once HODL_TIME has passed
+                schedule_exit({
+                    "symbol": symbol,
+                    "direction": direction,
+                    "message": message,
+                    "original_chat_id": original_chat_id,
+                    "start_time": start_time,
+                    "base_symbol": base_symbol,
+                    "order_size": order_size,
+                    "price": price,
+                    "corrected_initial_capital": corrected_initial_capital,
+                })
+                opened = True
             else:
-                error_msg = f"Buy order failed for {symbol}"
-                print(error_msg + "\n", flush=True)
-                await message.reply_text(error_msg, quote=True)
+                error_msg = f"{ENTRY_SIDE[direction]} order failed for {symbol}"
+                logger.info("%s\n", error_msg)
+                send_trade_reply(message, error_msg)
         except Exception as e:
             error_msg = f"Unexpected error during trade execution: {e}"
-            print(error_msg, flush=True)
-            await message.reply_text(error_msg, quote=True)
+            logger.info(error_msg)
+            send_trade_reply(message, error_msg)
     except Exception as e:
         error_msg = f"Critical error in trade function: {e}"
-        print(error_msg, flush=True)
-        await message.reply_text(error_msg, quote=True)
+        logger.info(error_msg)
+        send_trade_reply(message, error_msg)
+    finally:
+        # An open position keeps its symbol claimed until close_trade()
+        if not opened:
+            release_symbol(symbol)
+
+
+# [Binance] Close a position opened by trade() and report the result
+async def close_trade(ctx):
+    symbol = ctx["symbol"]
+    direction = ctx["direction"]
+    message = ctx["message"]
+    original_chat_id = ctx["original_chat_id"]
+    start_time = ctx["start_time"]
+    base_symbol = ctx["base_symbol"]
+    order_size = ctx["order_size"]
+    price = ctx["price"]
+    corrected_initial_capital = ctx["corrected_initial_capital"]
+    requeued = False
+    try:
+        logger.info("\nHodling for %s seconds...\n", HODL_TIME)
+
+        if BINANCE_MAINNET_FLAG:
+            # Keep one client order ID across close attempts, so a retry
+            # picks up an exit that was placed despite an error
+            resume = "exit_client_order_id" in ctx
+            exit_order = await place_market_order(
+                symbol, EXIT_ORDER_SIDE[direction], order_size,
+                ctx.setdefault("exit_client_order_id", new_client_order_id()),
+                resume=resume,
+                reduce_only=True)
+        else:
+            exit_order = True
+
+        realised_pnl = 0
+        if BINANCE_MAINNET_FLAG:
+            if exit_order is False:
+                # Rejected by the exchange, e.g. the position is already
+                # closed, so retrying won't help
+                error_msg = f"{EXIT_SIDE[direction]} order for {symbol} was rejected, please check the position manually"
+                logger.error("%s\n", error_msg)
+                send_trade_reply(message, error_msg)
+                return
+            if exit_order is None:
+                exit_retries = ctx.get("exit_retries", 0)
+                if exit_retries >= EXIT_MAX_RETRIES:
+                    error_msg = f"{EXIT_SIDE[direction]} order failed for {symbol} after {exit_retries} close retries, please close the position manually"
+                    logger.error("%s\n", error_msg)
+                    send_trade_reply(message, error_msg)
+                    return
+
+                # The position is still open, try to close it again later,
+                # backing off between attempts
+                delay = EXIT_RETRY_DELAY * 2**exit_retries
+                ctx["exit_retries"] = exit_retries + 1
+                error_msg = f"{EXIT_SIDE[direction]} order failed for {symbol}, retrying the close in {delay}s"
+                logger.info("%s\n", error_msg)
+                # Only the first failure is replied to, the final outcome
+                # gets its own reply
+                if exit_retries == 0:
+                    send_trade_reply(message, error_msg)
+                schedule_exit(ctx, delay)
+                requeued = True
+                return
+            new_price = await get_fill_price(symbol, exit_order)
+            if new_price is None:
+                ticker = await fetch_ticker(symbol)
+                new_price = float(ticker["price"]) if ticker else price
+                logger.warning(
+                    "Could not get the fill price of %s, using $%s",
+                    symbol, new_price)
+
+            trades = await wait_for_trades(symbol, exit_order["orderId"])
+            realised_pnl = sum(float(t["realizedPnl"]) for t in trades)
+        else:
+            ticker = await fetch_ticker(symbol)
+
+            if not ticker:
+                error_msg = f"Failed to get updated ticker data for {symbol}"
+                logger.info(error_msg)
+                send_trade_reply(message, error_msg)
+                return
+
+            try:
+                new_price = float(ticker["price"])
+            except (KeyError, ValueError) as e:
+                error_msg = f"Invalid updated ticker data for {symbol}: {e}"
+                logger.info(error_msg)
+                send_trade_reply(message, error_msg)
+                return
+
+        if exit_order:
+            logger.info("Market %s Order Executed: %.2f %s at $%s\n",
+                        EXIT_SIDE[direction], order_size, base_symbol,
+                        new_price)
+
+            final_capital = calculate_final_capital(
+                direction, corrected_initial_capital, price, new_price,
+                order_size)
+            percentage_gained = (
+                (final_capital - corrected_initial_capital) /
+                corrected_initial_capital) * 100
+
+            # One write for the whole summary so concurrent trades
+            # don't interleave their lines
+            summary_lines = [
+                "Trade Summary:",
+                "----------------------------------",
+                f"Before Capital: ${corrected_initial_capital:.2f}",
+                f"After Capital: ${final_capital:.2f} ({percentage_gained:+.2f}%)",
+            ]
+            if BINANCE_MAINNET_FLAG:
+                summary_lines.append(
+                    f"Realised PNL: ${realised_pnl:.2f}")
+            summary_lines.append("----------------------------------\n")
+            logger.info("\n".join(summary_lines))
+
+            if BINANCE_MAINNET_FLAG:
+                pnl_line = f"__Realised PNL:__ ${realised_pnl:.2f} USD"
+            else:
+                pnl_line = f"__PNL:__ ${final_capital - corrected_initial_capital:.2f} USD"
+            content = TRADE_RESULT_TEMPLATE.format(
+                direction=direction,
+                symbol=symbol,
+                notional=NOTIONAL,
+                entry_side=ENTRY_SIDE[direction],
+                exit_side=EXIT_SIDE[direction],
+                order_size=order_size,
+                base_symbol=base_symbol,
+                price=price,
+                hodl_mins=HODL_TIME / 60,
+                new_price=new_price,
+                before_capital=corrected_initial_capital,
+                after_capital=final_capital,
+                percentage_gained=percentage_gained,
+                pnl_line=pnl_line,
+                time_taken=time.time() - start_time)
+
+            pnl = final_capital - corrected_initial_capital
+
+            await update_trade_data(str(original_chat_id), pnl)
+            send_trade_reply(message, content)
+        else:
+            error_msg = f"{EXIT_SIDE[direction]} order failed for {symbol}"
+            logger.info("%s\n", error_msg)
+            send_trade_reply(message, error_msg)
+    except Exception as e:
+        error_msg = f"Unexpected error during trade execution: {e}"
+        logger.info(error_msg)
+        send_trade_reply(message, error_msg)
     finally:
-        processing_symbols.remove(symbol)
+        # A position waiting on another close attempt keeps its claim
+        if not requeued:
+            release_symbol(symbol)
+
+
+# [Binance] Exit timer: positions waiting for their close, ordered by due time
+exit_heap = []
+exit_heap_changed = asyncio.Event()
+exit_seq = itertools.count()  # tie-breaker, trade contexts aren't comparable
+
+
+def schedule_exit(ctx, delay=HODL_TIME):
+    heapq.heappush(exit_heap,
+                   (time.monotonic() + delay, next(exit_seq), ctx))
+    exit_heap_changed.set()
+
+
+async def exit_timer_loop():
+    while True:
+        if not exit_heap:
+            exit_heap_changed.clear()
+            await exit_heap_changed.wait()
+            continue
+
+        delay = exit_heap[0][0] - time.monotonic()
+        if delay > 0:
+            exit_heap_changed.clear()
+            try:
+                await asyncio.wait_for(exit_heap_changed.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        _, _, ctx = heapq.heappop(exit_heap)
+        await symbol_queue.put(("close", ctx))
+        if not idle_workers and len(workers) < NUM_WORKERS:
+            set_scale(len(workers) + 1)
 
 
 # [Binance] Worker function to process tickers from the queue asynchronously
 async def worker():
+    task = asyncio.current_task()
     while True:
-        item = await symbol_queue.get(
-        )  # Asynchronously get a symbol and message from the queue
-        if item is None:
-            break
+        # Only idle workers (waiting here) are ever retired by set_scale()
+        idle_workers.add(task)
+        try:
+            item = await symbol_queue.get(
+            )  # Asynchronously get a symbol and message from the queue
+        finally:
+            idle_workers.discard(task)
 
-        symbol, direction, message, original_chat_id, start_time = item
+        kind, payload = item
+        if kind == "close":
+            await close_trade(payload)
+        else:
+            symbol, direction, message, original_chat_id, start_time = payload
 
-        # Remove from pending and add to processing
-        pending_symbols.remove(symbol)
-        processing_symbols.add(symbol)
+            # Move from pending to processing
+            in_flight[symbol] = PROCESSING
 
-        # Execute trade
-        await trade(symbol, direction, message, original_chat_id, start_time)
+            # Open the position, the close is queued later by the exit timer
+            await trade(symbol, direction, message, original_chat_id,
+                        start_time)
 
         symbol_queue.task_done()
 
 
-# [Telebot (Synchronous)] Client
-# bot = telebot.TeleBot(TELEGRAM_BOT_TOKEN, threaded=False)
-bot = telebot.TeleBot('', threaded=False)
-print(f"Checking Telegram Bot status...\n")
+# [Binance] Trade worker pool, resized between MIN_WORKERS and NUM_WORKERS
+workers = set()
+idle_workers = set()
 
-try:
-    bot_info = bot.get_me()
-    bot_member = bot.get_chat_member(MAIN_CHAT_ID, bot_info.id)
 
-    if bot_member.status in ["administrator", "member"]:
-        print(f"Telegram Bot is in the chat (status: {bot_member.status})")
-        print(f"Telegram Bot will reply to messages...\n")
-        use_bot = True
+def set_scale(n):
+    n = max(MIN_WORKERS, min(NUM_WORKERS, n))
+    surplus = len(workers) - n
+    if surplus > 0:
+        # Retire idle workers only, never one in the middle of a trade
+        for task in list(idle_workers)[:surplus]:
+            idle_workers.discard(task)
+            task.cancel()
     else:
-        print(f"Telegram Bot is not in the chat (status: {bot_member.status})")
-        print(f"User will reply to messages instead...\n")
-        use_bot = False
+        for _ in range(-surplus):
+            task = asyncio.create_task(worker())
+            workers.add(task)
+            task.add_done_callback(workers.discard)
 
-except Exception as e:
-    print(f"Telegram Bot cannot be used: {e}")
-    print(f"User will reply to messages instead...\n")
-    use_bot = False
 
-# [Aiogram (Asynchronous)] Client (this will be used instead of the synchronous bot)
+def get_used_weight():
+    # Weight used in the current minute, as reported on the last response
+    try:
+        return int(client.response.headers.get("X-MBX-USED-WEIGHT-1M", 0))
+    except (AttributeError, ValueError):
+        return 0
+
+
+async def scale_workers_loop():
+    while True:
+        await asyncio.sleep(WORKER_SCALE_INTERVAL)
+        busy = len(workers) - len(idle_workers)
+        if get_used_weight() > BINANCE_WEIGHT_LIMIT * 0.8:
+            # Close to the rate limit, don't add more concurrent trades
+            target = busy
+        else:
+            target = busy + symbol_queue.qsize() + MIN_WORKERS
+        if target != len(workers):
+            logger.info("Scaling trade workers from %d to %d\n",
+                        len(workers), max(MIN_WORKERS, min(NUM_WORKERS, target)))
+            set_scale(target)
+
+
+# [Telegram] Analysis replies are sent by the Pyrogram user account. The
+# follow-up trade notices chain off those replies with reply_text(), which
+# only Pyrogram messages support, so the bot is not used for replies.
+
+# [Aiogram (Asynchronous)] Client
+# Only long polling and /command replies go through the bot, so a small
+# connection pool is enough
 bot = Bot(token=TELEGRAM_BOT_TOKEN,
+          session=AiohttpSession(limit=4),
           default=DefaultBotProperties(parse_mode=ParseMode.HTML))
 
 # [Aiogram] Settings
 PNL_FILE_PATH = "pnl_data.json"
 STATS_FILE_PATH = "stats_data.json"
 lock = asyncio.Lock()
+pnl_data_cache = None  # (loaded_at, data)
+pnl_data_task = None
+pnl_data_version = 0
 dp = Dispatcher()
 router = Router()
 dp.include_router(router)
 chat_id_name_dict = {}
+chat_id_display_name_dict = {}
+sorted_chat_display_names = []  # [(chat ID, display name)] sorted by name
+bot_id = None
 
 
 # [Pyrogram] Monkey Patch
 def get_peer_type(peer_id: int) -> str:
-    peer_id_str = str(peer_id)
-    if not peer_id_str.startswith("-"):
+    # Users are positive, channel IDs are -100 followed by at least 10 digits
+    if peer_id > 0:
         return "user"
-    elif peer_id_str.startswith("-100"):
-        return "channel"
-    else:
-        return "chat"
+    return "channel" if peer_id < -1000000000000 else "chat"
 
 
 utils.get_peer_type = get_peer_type
@@ -549,7 +1031,10 @@ utils.get_peer_type = get_peer_type
 app = Client("text_listener", TELEGRAM_API_KEY, TELEGRAM_HASH)
 
 # [Pyrogram] Settings
-message_queue = asyncio.Queue()
+llm_semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
+message_tasks = set()
+forward_buffers = {}  # source chat ID -> [(message ID, text, start_time), ...]
+forward_tasks = set()
 
 
 # [Instructor] Pydantic Model for Sentiment Analysis
@@ -606,196 +1091,315 @@ except Exception as e:
     print(f"Traceback: {traceback.format_exc()}\n", flush=True)
     instructor_client = None
 
-# [Pyrogram] LLM API
-async def message_processor():
-    while True:
-        try:
-            forwarded_message, message, start_time = await message_queue.get()
-
-            # Start timer for LLM processing
-            llm_start_time = time.time()
-
-            # Check if instructor client is available
-            if instructor_client is None:
-                error_msg = "Instructor client is not initialized. Cannot process message."
-                print(error_msg, flush=True)
-                if use_bot:
-                    await bot.send_message(
-                        forwarded_message.chat.id,
-                        error_msg,
-                        reply_to_message_id=forwarded_message.id)
-                else:
-                    await forwarded_message.reply_text(error_msg, quote=True)
-                message_queue.task_done()
-                continue
+# [Pyrogram] Characters that cannot be part of a ticker (e.g. "$BTC", "#ETH")
+NON_TICKER_PATTERN = re.compile(r'[^A-Z0-9]')
+
+
+# [Pyrogram] Normalize an LLM coin ticker into a Binance USDT symbol
+@functools.lru_cache(maxsize=1024)
+def normalize_symbol(coin):
+    symbol = coin.upper()
+    if symbol == 'N/A':
+        return None
+    # Plain tickers such as "BTC" are the common case and need no regex
+    if not (symbol.isascii() and symbol.isalnum()):
+        symbol = NON_TICKER_PATTERN.sub('', symbol)
+        if not symbol:
+            return None
+    # Interned so every alias of a ticker shares one string object
+    return sys.intern(symbol if symbol.endswith("USDT") else symbol + "USDT")
+
+
+# [Pyrogram] Check a single coin from the LLM result and queue its trade
+async def queue_coin_trade(coin_sentiment, replied_messsage, chat_id,
+                           start_time, not_found_tickers,
+                           below_threshold_tickers):
+    # Enforce UPPERCASE ticker
+    coin_ticker = coin_sentiment.coin.upper()
+    sentiment = coin_sentiment.sentiment
+
+    symbol = normalize_symbol(coin_sentiment.coin)
+    if symbol is None:
+        return
+
+    # Check if sentiment meets threshold for this specific coin
+    if abs(sentiment) < TRADE_SENTIMENT_THRESHOLD:
+        below_threshold_tickers.append(f"{coin_ticker} ({sentiment:.1f}%)")
+        return
+
+    # Determine direction based on this coin's sentiment
+    direction = "LONG" if sentiment > 0 else "SHORT"
+
+    # Check if ticker can be traded in Binance
+    if symbol in perps_tokens:
+        # Check if symbol is in top market cap
+        if await is_top_market_cap(symbol):
+            text = f"{symbol} is in the top {TOP_N_MARKETCAP} market cap list, skipping trade...\n"
+            logger.info(text)
+            await replied_messsage.reply_text(
+                text, quote=True)
+            return
 
+        # Check if symbol is already in queue or being processed
+        if symbol in in_flight:
+            text = f"{symbol} is already in queue or being processed for a trade, skipping...\n"
+            logger.info(text)
+            await replied_messsage.reply_text(
+                text, quote=True)
+        elif symbol_queue.full():
+            text = f"Trade queue is full, skipping {symbol}...\n"
+            logger.info(text)
+            await replied_messsage.reply_text(
+                text, quote=True)
+        else:
+            # Claim the symbol before awaiting, other coins and messages
+            # are being processed concurrently
+            claim_symbol(symbol)
             try:
-                # Use instructor client for structured extraction
-                user_content = forwarded_message.text or forwarded_message.caption
-                if not user_content:
-                    error_msg = "No text or caption found in forwarded message"
-                    print(error_msg, flush=True)
-                    if use_bot:
-                        await bot.send_message(
-                            forwarded_message.chat.id,
-                            error_msg,
-                            reply_to_message_id=forwarded_message.id)
-                    else:
-                        await forwarded_message.reply_text(error_msg, quote=True)
-                    message_queue.task_done()
-                    continue
-
-                result = await instructor_client.chat.completions.create(
-                    response_model=SentimentAnalysis,
-                    messages=[
-                        {"role": "system", "content": PROMPT},
-                        {"role": "user", "content": user_content}
-                    ],
-                )
-
-                # Calculate LLM processing time
-                llm_time = time.time() - llm_start_time
-
-                # Format reply content using structured model data with per-coin sentiment
-                if result.coins:
-                    coin_lines = []
-                    for coin_sentiment in result.coins:
-                        coin_ticker = coin_sentiment.coin.upper()
-                        coin_lines.append(f"- {coin_ticker}: {coin_sentiment.sentiment:.1f}% | {coin_sentiment.explanation}")
-                    coins_str = "\n".join(coin_lines)
-                    content = f"Coins & Sentiments:\n{coins_str}\n\nTime Taken by LLM: {llm_time:.2f} seconds"
-                else:
-                    content = f"Coins: N/A\n\nTime Taken by LLM: {llm_time:.2f} seconds"
+                text = f"Ticker {symbol} ({direction}, {sentiment:.1f}%) found in Binance API, hence a trade will be executed now. It will be closed in {HODL_TIME / 60:,.2f} minutes.\n"
+                logger.info(text)
+                trade_replied_messsage = await replied_messsage.reply_text(
+                    text, quote=True)
+                logger.info("Adding %s to the queue\n", symbol)
+                symbol_queue.put_nowait(
+                    ("open", (symbol, direction,
+                              trade_replied_messsage,
+                              chat_id,
+                              start_time))
+                )  # Pass timing info to trade
+            except asyncio.QueueFull:
+                release_symbol(symbol)
+                text = f"Trade queue is full, skipping {symbol}...\n"
+                logger.info(text)
+                await replied_messsage.reply_text(text, quote=True)
+                return
+            except BaseException:
+                # Release the claim (e.g. the reply hit a FloodWait), or
+                # every later signal for the symbol would be skipped
+                release_symbol(symbol)
+                raise
 
-                if use_bot:
-                    replied_messsage = await bot.send_message(
-                        forwarded_message.chat.id,
-                        content,
-                        reply_to_message_id=forwarded_message.id)
-                else:
-                    replied_messsage = await forwarded_message.reply_text(
-                        content, quote=True)
-                print(f"Replied with content:\n{content}\n")
-
-                # Process each coin with its individual sentiment
-                not_found_tickers = []
-                below_threshold_tickers = []
-
-                for coin_sentiment in result.coins:
-                    # Enforce UPPERCASE ticker
-                    coin_ticker = coin_sentiment.coin.upper()
-                    sentiment = coin_sentiment.sentiment
-
-                    if coin_ticker == 'N/A' or not coin_ticker:
-                        continue
-
-                    # Check if sentiment meets threshold for this specific coin
-                    if abs(sentiment) < TRADE_SENTIMENT_THRESHOLD:
-                        below_threshold_tickers.append(f"{coin_ticker} ({sentiment:.1f}%)")
-                        continue
-
-                    # Determine direction based on this coin's sentiment
-                    direction = "LONG" if sentiment > 0 else "SHORT"
-
-                    # Build symbol with USDT suffix
-                    symbol = coin_ticker if "USDT" in coin_ticker else coin_ticker + "USDT"
-
-                    # Check if ticker can be traded in Binance
-                    if symbol in perps_tokens:
-                        # Check if symbol is in top market cap
-                        if is_top_market_cap(symbol):
-                            text = f"{symbol} is in the top {TOP_N_MARKETCAP} market cap list, skipping trade...\n"
-                            print(text, flush=True)
-                            await replied_messsage.reply_text(
-                                text, quote=True)
-                            continue
-
-                        # Check if symbol is already in queue or being processed
-                        if symbol in processing_symbols or symbol in pending_symbols:
-                            text = f"{symbol} is already in queue or being processed for a trade, skipping...\n"
-                            print(text, flush=True)
-                            await replied_messsage.reply_text(
-                                text, quote=True)
-                        else:
-                            text = f"Ticker {symbol} ({direction}, {sentiment:.1f}%) found in Binance API, hence a trade will be executed now. It will be closed in {HODL_TIME / 60:,.2f} minutes.\n"
-                            print(text, flush=True)
-                            trade_replied_messsage = await replied_messsage.reply_text(
-                                text, quote=True)
-                            print(
-                                f"Adding {symbol} to the queue\n",
-                                flush=True)
-                            pending_symbols.add(
-                                symbol
-                            )  # Add to pending set before putting in queue
-                            await symbol_queue.put(
-                                (symbol, direction,
-                                 trade_replied_messsage,
-                                 message.chat.id,
-                                 start_time)
-                            )  # Pass timing info to trade
-
-                    else:
-                        not_found_tickers.append(symbol)
-
-                if below_threshold_tickers:
-                    below_threshold_str = ", ".join(below_threshold_tickers)
-                    text = f"Ticker(s) {below_threshold_str} below sentiment threshold ({TRADE_SENTIMENT_THRESHOLD}%), no trade executed.\n"
-                    print(text)
-                    await replied_messsage.reply_text(text, quote=True)
-
-                if not_found_tickers:
-                    not_found_tickers_string = ", ".join(not_found_tickers)
-                    text = f"Ticker(s) {not_found_tickers_string} not found in Binance API, hence no trade is executed.\n"
-                    print(text)
-                    await replied_messsage.reply_text(
-                        text, quote=True)
+            # Grow the pool right away if every worker is busy
+            if not idle_workers and len(workers) < NUM_WORKERS:
+                set_scale(len(workers) + 1)
 
-            except Exception as e:
-                error_msg = f"Error processing message with Instructor: {e}"
-                print(error_msg, flush=True)
-                import traceback
-                traceback.print_exc()
-                if use_bot:
-                    await bot.send_message(
-                        forwarded_message.chat.id,
-                        error_msg,
-                        reply_to_message_id=forwarded_message.id)
-                else:
-                    await forwarded_message.reply_text(
-                        error_msg, quote=True)
-        except Exception as e:
-            print(f"Critical error in message processor: {e}\n",
-                  flush=True)
-            import traceback
-            traceback.print_exc()
-        finally:
-            message_queue.task_done()
+    else:
+        not_found_tickers.append(symbol)
+
+
+# [Pyrogram] Analyse a forwarded message with the LLM and queue any trades
+async def process_message(forwarded_message, chat_id, text, start_time):
+    # Start timer for LLM processing
+    llm_start_time = time.time()
+
+    # Check if instructor client is available
+    if instructor_client is None:
+        error_msg = "Instructor client is not initialized. Cannot process message."
+        logger.error(error_msg)
+        await forwarded_message.reply_text(error_msg, quote=True)
+        return
+
+    try:
+        # Use instructor client for structured extraction
+        result = await instructor_client.chat.completions.create(
+            response_model=SentimentAnalysis,
+            messages=[
+                {"role": "system", "content": PROMPT},
+                {"role": "user", "content": text}
+            ],
+        )
+
+        # Calculate LLM processing time
+        llm_time = time.time() - llm_start_time
+
+        # Format reply content using structured model data with per-coin sentiment
+        if result.coins:
+            coin_lines = []
+            for coin_sentiment in result.coins:
+                coin_ticker = coin_sentiment.coin.upper()
+                coin_lines.append(f"- {coin_ticker}: {coin_sentiment.sentiment:.1f}% | {coin_sentiment.explanation}")
+            coins_str = "\n".join(coin_lines)
+            content = f"Coins & Sentiments:\n{coins_str}\n\nTime Taken by LLM: {llm_time:.2f} seconds"
+        else:
+            content = f"Coins: N/A\n\nTime Taken by LLM: {llm_time:.2f} seconds"
+
+        replied_messsage = await forwarded_message.reply_text(
+            content, quote=True)
+        logger.info("Replied with content:\n%s\n", content)
+
+        # Process each coin with its individual sentiment
+        not_found_tickers = []
+        below_threshold_tickers = []
+
+        # One coin failing (e.g. its reply hitting a FloodWait) must not stop
+        # the others or the summary notices below
+        results = await asyncio.gather(*(queue_coin_trade(
+            coin_sentiment, replied_messsage, chat_id, start_time,
+            not_found_tickers, below_threshold_tickers)
+            for coin_sentiment in result.coins),
+            return_exceptions=True)
+        for coin_sentiment, coin_result in zip(result.coins, results):
+            if isinstance(coin_result, Exception):
+                logger.error("Error queueing trade for %s: %s\n",
+                             coin_sentiment.coin, coin_result)
+
+        if below_threshold_tickers:
+            below_threshold_str = ", ".join(below_threshold_tickers)
+            notice = f"Ticker(s) {below_threshold_str} below sentiment threshold ({TRADE_SENTIMENT_THRESHOLD}%), no trade executed.\n"
+            logger.info(notice)
+            await replied_messsage.reply_text(notice, quote=True)
+
+        if not_found_tickers:
+            not_found_tickers_string = ", ".join(not_found_tickers)
+            notice = f"Ticker(s) {not_found_tickers_string} not found in Binance API, hence no trade is executed.\n"
+            logger.info(notice)
+            await replied_messsage.reply_text(
+                notice, quote=True)
+
+    except Exception as e:
+        error_msg = f"Error processing message with Instructor: {e}"
+        logger.exception(error_msg)
+        await forwarded_message.reply_text(
+            error_msg, quote=True)
+
+
+# [Pyrogram] LLM API
+async def message_processor(forwarded_message, chat_id, text, start_time):
+    try:
+        # Cap the number of LLM calls in flight to the provider's budget
+        async with llm_semaphore:
+            await process_message(forwarded_message, chat_id, text,
+                                  start_time)
+    except Exception as e:
+        logger.exception("Critical error in message processor: %s\n", e)
 
 
 # [Pyrogram] Handler for incoming messages
 @app.on_message(filters.chat(CHAT_ID_LIST))
 async def my_handler(client, message):
-    if message.text or message.caption:
+    # Read each message attribute once; the text travels with the message
+    # so the processor does not have to re-derive it from the forward
+    text = message.text or message.caption
+    if text:
         start_time = time.time()  # Start timing when message is received
-        print(f"Message received from chat: {message.chat.id}")
-        print(f"Message: {message.text or message.caption}")
+        chat_id = message.chat.id
+        logger.info("Message received from chat: %s", chat_id)
+        logger.debug("Message: %s", text)
+
+        # Buffer the message so a burst from one chat is forwarded in one call
+        item = (message.id, text, start_time)
+        pending = forward_buffers.get(chat_id)
+        if pending is None:
+            forward_buffers[chat_id] = [item]
+            task = asyncio.create_task(flush_forward_buffer(chat_id))
+            forward_tasks.add(task)
+            task.add_done_callback(forward_tasks.discard)
+        else:
+            pending.append(item)
+
+
+# [Pyrogram] Match forwarded messages back to the buffered messages they came
+# from. Deleted source messages are skipped by Telegram, so the results can't
+# be paired by position. Channel posts carry their original message ID,
+# messages from other chats are matched by their text
+def match_forwarded_messages(pending, forwarded_messages):
+    by_id = {message_id: (text, start_time)
+             for message_id, text, start_time in pending}
+    ids_by_text = {}
+    for message_id, text, _ in pending:
+        ids_by_text.setdefault(text, []).append(message_id)
+
+    matched = []
+    for forwarded_message in forwarded_messages:
+        if forwarded_message is None:
+            continue
+        message_id = getattr(forwarded_message, "forward_from_message_id",
+                             None)
+        if message_id not in by_id:
+            candidates = ids_by_text.get(
+                forwarded_message.text or forwarded_message.caption, [])
+            while candidates and candidates[0] not in by_id:
+                candidates.pop(0)
+            message_id = candidates.pop(0) if candidates else None
+        item = by_id.pop(message_id, None)
+        if item is None:
+            logger.warning("Could not match forwarded message %s to its source\n",
+                           forwarded_message.id)
+            continue
+        matched.append((forwarded_message, ) + item)
 
-        try:
-            forwarded_message = await message.forward(chat_id=int(MAIN_CHAT_ID)
-                                                      )
-            print("Message forwarded successfully.\n")
+    for message_id in by_id:
+        logger.warning("Message %s was not forwarded (deleted before forwarding?)\n",
+                       message_id)
+    return matched
+
+
+# [Pyrogram] Forward all buffered messages of a source chat in one request,
+# falling back to one request per message if the batch fails
+async def forward_pending_messages(chat_id, pending):
+    try:
+        forwarded_messages = await app.forward_messages(
+            chat_id=int(MAIN_CHAT_ID),
+            from_chat_id=chat_id,
+            message_ids=[message_id for message_id, _, _ in pending])
+        if not isinstance(forwarded_messages, list):
+            forwarded_messages = [forwarded_messages]
+        return match_forwarded_messages(pending, forwarded_messages)
+    except Exception as e:
+        logger.error(
+            "Error forwarding %d message(s) from chat %s, forwarding one by one: %s\n",
+            len(pending), chat_id, e)
 
-            # Pass timing info along with the messages
-            await message_queue.put((forwarded_message, message, start_time))
+    matched = []
+    for message_id, text, start_time in pending:
+        try:
+            forwarded_message = await app.forward_messages(
+                chat_id=int(MAIN_CHAT_ID),
+                from_chat_id=chat_id,
+                message_ids=message_id)
         except Exception as e:
-            print(f"Error forwarding message: {e}\n")
+            logger.error("Error forwarding message %s from chat %s: %s\n",
+                         message_id, chat_id, e)
+            continue
+        if forwarded_message is not None:
+            matched.append((forwarded_message, text, start_time))
+    return matched
+
+
+# [Pyrogram] Forward the buffered messages of a source chat and analyse them
+async def flush_forward_buffer(chat_id):
+    await asyncio.sleep(FORWARD_BATCH_INTERVAL)
+    pending = sorted(forward_buffers.pop(chat_id, []),
+                     key=lambda item: item[0])
+    if not pending:
+        return
+
+    forwarded = await forward_pending_messages(chat_id, pending)
+    logger.info("%d message(s) forwarded successfully.\n", len(forwarded))
+
+    for forwarded_message, text, start_time in forwarded:
+        # Drop the message if the LLM has fallen too far behind
+        if len(message_tasks) >= MAX_PENDING_MESSAGES:
+            logger.warning(
+                "Too many pending messages (%d), dropping message from chat: %s\n",
+                MAX_PENDING_MESSAGES, chat_id)
+            continue
+
+        # Pass timing info along with the messages
+        task = asyncio.create_task(
+            message_processor(forwarded_message, chat_id, text, start_time))
+        message_tasks.add(task)
+        task.add_done_callback(message_tasks.discard)
 
 
 # [Aiogram] Check if the bot is a member of the chat
 async def check_bot_membership():
+    global bot_id
     try:
-        bot_info = await bot.get_me()
-        bot_member = await bot.get_chat_member(MAIN_CHAT_ID, bot_info.id)
+        # The bot's own user ID never changes, so only look it up once
+        if bot_id is None:
+            bot_id = (await bot.get_me()).id
+        bot_member = await bot.get_chat_member(MAIN_CHAT_ID, bot_id)
 
         if bot_member.status not in ["administrator", "member"]:
             print("Bot is not in the chat MAIN_CHAT_ID. Exiting...\n")
@@ -814,50 +1418,82 @@ async def check_bot_membership():
 async def load_data(FILE_PATH):
     """Load JSON data asynchronously without acquiring the lock."""
     try:
-        async with aiofiles.open(FILE_PATH, "r") as f:
+        async with aiofiles.open(FILE_PATH, "rb") as f:
             contents = await f.read()
-            return json.loads(contents)
-    except (FileNotFoundError, json.JSONDecodeError):
+            return orjson.loads(contents)
+    except (FileNotFoundError, orjson.JSONDecodeError):
         return {}
 
 
 # Save JSON data asynchronously
 async def save_data(data, FILE_PATH):
     """Save JSON data asynchronously."""
-    async with aiofiles.open(FILE_PATH, "w") as f:
-        await f.write(json.dumps(data, indent=4))
+    # Write to a temp file and swap it in, so a crash or a concurrent
+    # load_data() never sees a half-written file
+    tmp_path = FILE_PATH + ".tmp"
+    async with aiofiles.open(tmp_path, "wb") as f:
+        await f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    await aiofiles.os.replace(tmp_path, FILE_PATH)
 
 
-# Update JSON data asynchronously
-async def update_pnl_data(new_data):
-    """Load, update by summing values, and save JSON data with a lock."""
+# Record a closed trade in the PNL and stats JSON files
+async def update_trade_data(chat_id, pnl):
+    """Load, update and save both the PNL and stats JSON data under one lock."""
     async with lock:
-        data = await load_data(PNL_FILE_PATH)
-        key, value = list(new_data.items())[0]
-        data[key] = round(data.get(key, 0) + value, 2)
-        await save_data(data, PNL_FILE_PATH)
+        pnl_data, stats_data = await asyncio.gather(
+            load_data(PNL_FILE_PATH), load_data(STATS_FILE_PATH))
 
+        pnl_data[chat_id] = round(pnl_data.get(chat_id, 0) + pnl, 2)
 
-async def update_stats_data(pnl):
-    """Load, update by summing values, and save JSON data with a lock."""
-    async with lock:
-        data = await load_data(STATS_FILE_PATH)
-        prev_max_gain = data.get("Maximum Gain", 0)
-        prev_max_drawdown = data.get("Maximum Drawdown", 0)
-        prev_avg_gain = data.get("Average Gain", 0)
-        total_no_of_trades = data.get("Total No. of Trades", 0)
+        prev_max_gain = stats_data.get("Maximum Gain", 0)
+        prev_max_drawdown = stats_data.get("Maximum Drawdown", 0)
+        prev_avg_gain = stats_data.get("Average Gain", 0)
+        total_no_of_trades = stats_data.get("Total No. of Trades", 0)
 
         if pnl >= 0:
-            data["Maximum Gain"] = round(max(prev_max_gain, pnl), 2)
+            stats_data["Maximum Gain"] = round(max(prev_max_gain, pnl), 2)
         else:
-            data["Maximum Drawdown"] = round(min(prev_max_drawdown, pnl), 2)
+            stats_data["Maximum Drawdown"] = round(
+                min(prev_max_drawdown, pnl), 2)
 
-        data["Average Gain"] = round(
+        stats_data["Average Gain"] = round(
             ((prev_avg_gain * total_no_of_trades) + pnl) /
             (total_no_of_trades + 1), 2)
-        data["Total No. of Trades"] = total_no_of_trades + 1
+        stats_data["Total No. of Trades"] = total_no_of_trades + 1
+
+        await asyncio.gather(save_data(pnl_data, PNL_FILE_PATH),
+                             save_data(stats_data, STATS_FILE_PATH))
+        invalidate_pnl_data_cache()
+
+
+# Drop the cached PNL data so the next reader goes back to disk
+def invalidate_pnl_data_cache():
+    global pnl_data_cache, pnl_data_version
+    pnl_data_cache = None
+    pnl_data_version += 1
+
 
-        await save_data(data, STATS_FILE_PATH)
+async def _load_pnl_data():
+    global pnl_data_cache, pnl_data_task
+    version = pnl_data_version
+    try:
+        data = await load_data(PNL_FILE_PATH)
+        # Only cache if no update landed while the file was being read
+        if version == pnl_data_version:
+            pnl_data_cache = (time.time(), data)
+        return data
+    finally:
+        pnl_data_task = None
+
+
+# Get PNL data, sharing one in-flight read between concurrent callers
+async def get_pnl_data(ttl=5):
+    global pnl_data_task
+    if pnl_data_cache is not None and time.time() - pnl_data_cache[0] < ttl:
+        return pnl_data_cache[1]
+    if pnl_data_task is None:
+        pnl_data_task = asyncio.create_task(_load_pnl_data())
+    return await asyncio.shield(pnl_data_task)
 
 
 # [Aiogram] Set bot commands
@@ -882,40 +1518,76 @@ async def command_start_handler(message: Message) -> None:
     await message.answer(f"Hello, {html.bold(message.from_user.full_name)}!")
 
 
+# [Aiogram] Render a titled, bordered text table (same layout as PrettyTable)
+def render_table(title, header, rows, max_widths, aligns):
+    """Render rows as an HTML message, wrapping cells to max_widths."""
+    # Sized like PrettyTable: the longest cell capped at max_width (the
+    # header is never capped), then longer cells wrap to the column width
+    widths = [
+        max([len(header[col])] +
+            [min(len(row[col]), max_width) for row in rows])
+        for col, max_width in enumerate(max_widths)
+    ]
+    cells = [[[value] for value in header]] + [[
+        textwrap.wrap(value, width) or ['']
+        for value, width in zip(row, widths)
+    ] for row in rows]
+    border = '+' + '+'.join('-' * (width + 2) for width in widths) + '+'
+
+    buffer = io.StringIO()
+    buffer.write(f'<b>{title}:</b>\n<pre>')
+    buffer.write(border)
+    for row_index, row in enumerate(cells):
+        for line_index in range(max(len(cell) for cell in row)):
+            buffer.write('\n|')
+            for cell, width, align in zip(row, widths, aligns):
+                text = cell[line_index] if line_index < len(cell) else ''
+                buffer.write(' ')
+                buffer.write(
+                    text.ljust(width) if align == 'l' else text.rjust(width))
+                buffer.write(' |')
+        if row_index == 0:
+            buffer.write('\n')
+            buffer.write(border)
+    buffer.write('\n')
+    buffer.write(border)
+    buffer.write('</pre>')
+
+    return buffer.getvalue()
+
+
 # [Aiogram] /pnl command handler
 @router.message(Command("pnl"))
 async def cmd_pnl(message: Message,
                   chat_name_width: int = 17,
                   pnl_width: int = 12):
     """Handle /pnl command, send current data to Telegram group."""
-    data = await load_data(PNL_FILE_PATH)
+    data = await get_pnl_data()
 
     if data:
-        renamed_data = []
-        total_pnl = 0
-        for chat_id, pnl in data.items():
-            chat_name = chat_id_name_dict.get(chat_id, chat_id)
-            chat_name = re.sub(r'[^A-Za-z0-9\s]', '', chat_name)
-            chat_name = re.sub(r'\s+', ' ', chat_name)
-            chat_name = chat_name.strip()
-            renamed_data.append((chat_name, pnl))
-            total_pnl += pnl
-        sorted_data = sorted(renamed_data, key=lambda x: x[0])
-
-        table = pt.PrettyTable(['Chat Name', 'PNL (in USD)'])
-        table.align['Chat Name'] = 'l'
-        table.align['PNL (in USD)'] = 'r'
-        table.max_width['Chat Name'] = chat_name_width
-        table.max_width['PNL (in USD)'] = pnl_width
+        # Monitored chats are kept sorted by name, only chats that are no
+        # longer monitored need sorting here
+        monitored_data = [(chat_name, data[chat_id])
+                          for chat_id, chat_name in sorted_chat_display_names
+                          if chat_id in data]
+        unmonitored_data = sorted(
+            (sanitize_chat_name(chat_id), pnl)
+            for chat_id, pnl in data.items()
+            if chat_id not in chat_id_display_name_dict)
+        sorted_data = heapq.merge(monitored_data,
+                                  unmonitored_data,
+                                  key=lambda x: x[0])
+        total_pnl = sum(data.values())
 
         table_title = "Current PNL Data"
-        for chat_name, pnl in sorted_data:
-            table.add_row([chat_name, f'{pnl:.2f}'])
-        table.add_row(["-" * chat_name_width, "-" * pnl_width])
-        table.add_row(["Total PNL", f'{total_pnl:.2f}'])
+        rows = [[chat_name, f'{pnl:.2f}'] for chat_name, pnl in sorted_data]
+        rows.append(["-" * chat_name_width, "-" * pnl_width])
+        rows.append(["Total PNL", f'{total_pnl:.2f}'])
+        content = render_table(table_title, ['Chat Name', 'PNL (in USD)'],
+                               rows, [chat_name_width, pnl_width],
+                               ['l', 'r'])
 
-        await message.answer(f'<b>{table_title}:</b>\n<pre>{table}</pre>',
-                             parse_mode=ParseMode.HTML)
+        await message.answer(content, parse_mode=ParseMode.HTML)
 
     else:
         await message.answer("No data available.")
@@ -936,21 +1608,15 @@ async def cmd_pnl(message: Message,
                         ('Total No. of Trades',
                          data.get("Total No. of Trades", 0))]
 
-        table = pt.PrettyTable(['Statistics', 'Value'])
-        table.align['Statistics'] = 'l'
-        table.align['Value'] = 'r'
-        table.max_width['Statistics'] = chat_name_width
-        table.max_width['Value'] = pnl_width
-
         table_title = "Current Trading Statistics"
-        for stat, value in ordered_data:
-            if stat != 'Total No. of Trades':
-                table.add_row([stat, f'{value:.2f} USD'])
-            else:
-                table.add_row([stat, f'{value}'])
+        rows = [[
+            stat, f'{value:.2f} USD' if stat != 'Total No. of Trades' else
+            f'{value}'
+        ] for stat, value in ordered_data]
+        content = render_table(table_title, ['Statistics', 'Value'], rows,
+                               [chat_name_width, pnl_width], ['l', 'r'])
 
-        await message.answer(f'<b>{table_title}:</b>\n<pre>{table}</pre>',
-                             parse_mode=ParseMode.HTML)
+        await message.answer(content, parse_mode=ParseMode.HTML)
 
     else:
         await message.answer("No data available.")
@@ -968,6 +1634,19 @@ async def cmd_help(message: Message):
     await message.answer(help_message)
 
 
+# Patterns used to sanitize chat names for the /pnl table
+NON_ALNUM_PATTERN = re.compile(r'[^A-Za-z0-9\s]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+# Strip a chat name down to the characters shown in the /pnl table
+@functools.lru_cache(maxsize=1024)
+def sanitize_chat_name(chat_name):
+    chat_name = NON_ALNUM_PATTERN.sub('', chat_name)
+    chat_name = WHITESPACE_PATTERN.sub(' ', chat_name)
+    return sys.intern(chat_name.strip())
+
+
 # [Pyrogram] Get chat ID and name dictionary
 async def get_chat_id_name_dict():
     for chat_id in CHAT_ID_LIST:
@@ -979,17 +1658,31 @@ async def get_chat_id_name_dict():
             chat_id_name_dict[chat_id_str] = chat_id_str
             continue
 
+    # Resolve the /pnl display names once instead of on every command
+    chat_id_display_name_dict.clear()
+    for chat_id_str, chat_name in chat_id_name_dict.items():
+        chat_id_display_name_dict[chat_id_str] = sanitize_chat_name(chat_name)
+    sorted_chat_display_names[:] = sorted(chat_id_display_name_dict.items(),
+                                          key=lambda x: x[1])
+
 
-def signal_handler(sig, frame):
-    print("Stopping the application...")
-    if app:
-        app.stop()
-    print("The application has stopped. Exiting.")
-    exit(0)
+# Set from the signal handlers, main() then shuts everything down in order
+shutdown_event = asyncio.Event()
 
 
-signal.signal(signal.SIGINT, signal_handler)  # SIGINT for Ctrl + C
-signal.signal(signal.SIGTSTP, signal_handler)  # SIGTSTP for Ctrl + Z
+def request_shutdown(sig):
+    print(f"Received {sig.name}, stopping the application...")
+    shutdown_event.set()
+
+
+def install_signal_handlers():
+    # Runs the handlers on the event loop, unlike signal.signal() which
+    # interrupts whatever Python code happens to be executing
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT,  # Ctrl + C
+                signal.SIGTERM,
+                signal.SIGTSTP):  # Ctrl + Z
+        loop.add_signal_handler(sig, request_shutdown, sig)
 
 
 async def main():
@@ -1024,11 +1717,11 @@ async def main():
             await app.stop()
             return
 
-        # Start worker tasks for trading system
+        # Start worker tasks for trading system, the pool grows on demand
         try:
-            workers = [
-                asyncio.create_task(worker()) for _ in range(NUM_WORKERS)
-            ]
+            set_scale(MIN_WORKERS)
+            scale_task = asyncio.create_task(scale_workers_loop())
+            exit_timer_task = asyncio.create_task(exit_timer_loop())
         except Exception as e:
             print(f"Failed to create worker tasks: {e}\n")
             await app.stop()
@@ -1037,32 +1730,39 @@ async def main():
         # Start market cap tracker update loop
         try:
             market_cap_task = asyncio.create_task(update_market_cap_loop())
+            price_task = asyncio.create_task(price_stream_loop())
         except Exception as e:
-            print(f"Failed to start market cap tracker: {e}\n")
-            for w in workers:
+            print(f"Failed to start market cap and price trackers: {e}\n")
+            scale_task.cancel()
+            exit_timer_task.cancel()
+            for w in list(workers):
                 w.cancel()
             await app.stop()
             return
 
         # Start Pyrogram-related tasks
         try:
-            bot_task = asyncio.create_task(message_processor())
-            idle_task = asyncio.create_task(idle())
+            outbox_task = asyncio.create_task(tg_outbox_sender())
             bot_commands_task = asyncio.create_task(set_commands())
-            tg_bot_task = asyncio.create_task(dp.start_polling(bot))
+            # Signals are handled by install_signal_handlers(), not aiogram
+            tg_bot_task = asyncio.create_task(
+                dp.start_polling(bot, handle_signals=False))
         except Exception as e:
             print(f"Failed to start bot tasks: {e}\n")
             market_cap_task.cancel()
-            for w in workers:
+            price_task.cancel()
+            scale_task.cancel()
+            exit_timer_task.cancel()
+            for w in list(workers):
                 w.cancel()
             await app.stop()
             return
 
-        # Program will now keep running forever, waiting for items to be added to the queue
+        # Program will now keep running until a shutdown signal arrives
         try:
-            # Main loop that waits for workers to finish their tasks
-            while True:
-                await asyncio.sleep(0.5)  # Sleep to avoid busy-waiting
+            install_signal_handlers()
+            await shutdown_event.wait()
+            print("\nShutting down gracefully...\n")
         except KeyboardInterrupt:
             print("\nShutting down gracefully...\n")
         except Exception as e:
@@ -1070,37 +1770,62 @@ async def main():
         finally:
             # Cancel all tasks
             print("Cancelling tasks...\n")
-            for w in workers:
+            scale_task.cancel()
+            exit_timer_task.cancel()
+            worker_tasks = list(workers)
+            for w in worker_tasks:
                 w.cancel()
             market_cap_task.cancel()
-            bot_task.cancel()
-            idle_task.cancel()
+            price_task.cancel()
+            pending_forward_tasks = list(forward_tasks)
+            for t in pending_forward_tasks:
+                t.cancel()
+            pending_message_tasks = list(message_tasks)
+            for t in pending_message_tasks:
+                t.cancel()
             bot_commands_task.cancel()
             tg_bot_task.cancel()
 
             # Wait for all tasks to complete
             try:
-                await asyncio.gather(*workers,
+                await asyncio.gather(*worker_tasks,
+                                     scale_task,
+                                     exit_timer_task,
                                      market_cap_task,
-                                     bot_task,
-                                     idle_task,
+                                     price_task,
+                                     *pending_forward_tasks,
+                                     *pending_message_tasks,
                                      bot_commands_task,
                                      tg_bot_task,
                                      return_exceptions=True)
             except Exception as e:
                 print(f"Error during task cleanup: {e}\n")
 
-            # Stop TG bot
-            try:
-                await bot.session.close()
-            except Exception as e:
-                print(f"Error closing bot session: {e}\n")
-
-            # Stop Pyrogram
+            # Send trade replies that were queued just before shutdown,
+            # while Pyrogram is still connected
             try:
-                await app.stop()
-            except Exception as e:
-                print(f"Error stopping Pyrogram: {e}\n")
+                await asyncio.wait_for(tg_outbox.join(),
+                                       timeout=OUTBOX_DRAIN_TIMEOUT)
+            except asyncio.TimeoutError:
+                print(f"Dropping {tg_outbox.qsize()} unsent trade replies\n")
+            outbox_task.cancel()
+            await asyncio.gather(outbox_task, return_exceptions=True)
+
+            # Close the TG bot and market cap sessions and stop Pyrogram
+            # concurrently, shutdown then takes as long as the slowest
+            closers = {
+                "bot session": bot.session.close(),
+                "market cap session": close_market_cap_session(),
+                "Pyrogram": app.stop(),
+            }
+            results = await asyncio.gather(*closers.values(),
+                                           return_exceptions=True)
+            for name, result in zip(closers, results):
+                if isinstance(result, Exception):
+                    print(f"Error closing {name}: {result}\n")
+
+            # Drain any queued log records before exiting
+            log_listener.stop()
 
     except Exception as e:
         print(f"Critical error in main function: {e}\n")
@@ -1,13 +1,13 @@
 import asyncio
 import random
-import time
-import os
 import math
+from binance import AsyncClient, BinanceSocketManager
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
 from config import (MAX_RETRIES, RETRY_AFTER, INITIAL_CAPITAL, LEVERAGE,
                     HODL_TIME, BINANCE_TESTNET_API_KEY,
-                    BINANCE_TESTNET_API_SECRET)
+                    BINANCE_TESTNET_API_SECRET, MAX_BACKOFF,
+                    TEST_NUM_WORKERS)
 import urllib3
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -19,18 +19,22 @@ client = Client(BINANCE_TESTNET_API_KEY,
 client.session.verify = False
 
 
-# Retry logic
-def retry_api_call(func, *args, **kwargs):
+# Retry logic, runs the blocking client call in a thread and waits without
+# blocking the event loop, so arrivals and other trades keep going while one
+# call is retrying
+async def retry_api_call(func, *args, **kwargs):
     retries = MAX_RETRIES or 3
     delay = RETRY_AFTER or 2
-    for _ in range(retries):
+    for attempt in range(retries):
         try:
-            return func(*args, **kwargs)
+            return await asyncio.to_thread(func, *args, **kwargs)
         except BinanceAPIException as e:
             print(f"Binance API Error: {e}. Retrying...", flush=True)
         except Exception as e:
             print(f"Unexpected error: {e}. Retrying...", flush=True)
-        time.sleep(delay)
+        # Exponential backoff with jitter so workers don't retry in lock-step
+        await asyncio.sleep(
+            min(MAX_BACKOFF, delay * 2**attempt) * random.uniform(0.5, 1.5))
     print("Max retries reached. Operation failed.", flush=True)
     return None
 
@@ -52,105 +56,135 @@ def get_symbol_precision():
 
 
 # Initialisation
-symbol_quantity_precision_dict = retry_api_call(get_symbol_precision)
+symbol_quantity_precision_dict = asyncio.run(
+    retry_api_call(get_symbol_precision))
 if not symbol_quantity_precision_dict:
     print("Failed to fetch quantity precision. Exiting...", flush=True)
     exit(1)
 print(symbol_quantity_precision_dict)
 
 symbol_queue = asyncio.Queue()
+POW10 = tuple(10**i for i in range(20))
+NOTIONAL = INITIAL_CAPITAL * LEVERAGE
 processing_symbols = set()
+queued_symbols = set()
+socket_manager = None  # BinanceSocketManager, created in main()
 
 
 # Get ticker price with retry logic
-def get_price(symbol):
-    return retry_api_call(client.futures_symbol_ticker, symbol=symbol)
+async def get_price(symbol):
+    return await retry_api_call(client.futures_symbol_ticker, symbol=symbol)
 
 
-def change_leverage(symbol, leverage):
-    retry_api_call(client.futures_change_leverage,
-                   symbol=symbol,
-                   leverage=leverage)
+async def change_leverage(symbol, leverage):
+    await retry_api_call(client.futures_change_leverage,
+                         symbol=symbol,
+                         leverage=leverage)
 
 
 # Place market buy order with retry logic
-def place_buy_order(symbol, order_size):
-    return retry_api_call(client.futures_create_order,
-                          symbol=symbol,
-                          side="BUY",
-                          type="MARKET",
-                          quantity=order_size)
+async def place_buy_order(symbol, order_size):
+    return await retry_api_call(client.futures_create_order,
+                                symbol=symbol,
+                                side="BUY",
+                                type="MARKET",
+                                quantity=order_size)
 
 
 # Place market sell order with retry logic
-def place_sell_order(symbol, order_size):
-    return retry_api_call(client.futures_create_order,
-                          symbol=symbol,
-                          side="SELL",
-                          type="MARKET",
-                          quantity=order_size)
+async def place_sell_order(symbol, order_size):
+    return await retry_api_call(client.futures_create_order,
+                                symbol=symbol,
+                                side="SELL",
+                                type="MARKET",
+                                quantity=order_size)
+
+
+# Keep the last traded price of a symbol updated from the websocket stream,
+# the same price the REST ticker returns
+async def watch_trade_price(symbol, latest_prices):
+    async with socket_manager.aggtrade_futures_socket(symbol) as stream:
+        while True:
+            msg = await stream.recv()
+            data = msg.get("data", msg)
+            if "p" in data:
+                latest_prices[symbol] = float(data["p"])
 
 
 # Function to simulate a trading operation for a single ticker
-async def trade(symbol):
-    base_symbol = symbol.replace("USDT", "")
-    selected_symbol_price_precision = symbol_quantity_precision_dict.get(
-        symbol)
-
-    print(f"\nTrading Parameters:")
-    print(f"----------------------------------", flush=True)
-    print(f"Symbol: {symbol}", flush=True)
-    print(f"Symbol Quantity Precision: {selected_symbol_price_precision}",
-          flush=True)
-    print(f"Initial Capital: ${INITIAL_CAPITAL:,.2f}", flush=True)
-    print(f"Leverage: {LEVERAGE}x", flush=True)
+async def trade(symbol, base_symbol, selected_symbol_price_precision, pow10):
+
+    # Collect the trade narrative and print it in a few writes rather than
+    # one flushed print per line
+    log_lines = [
+        "\nTrading Parameters:",
+        "----------------------------------",
+        f"Symbol: {symbol}",
+        f"Symbol Quantity Precision: {selected_symbol_price_precision}",
+        f"Initial Capital: ${INITIAL_CAPITAL:,.2f}",
+        f"Leverage: {LEVERAGE}x",
+    ]
 
     # Get ticker's price
-    ticker = get_price(symbol)
+    ticker = await get_price(symbol)
     price = float(ticker["price"])
 
     # Calculate order size
-    order_size = (INITIAL_CAPITAL * LEVERAGE) / price
+    order_size = NOTIONAL / price
     if selected_symbol_price_precision:
-        order_size = math.floor(order_size *
-                                (10**selected_symbol_price_precision)) / (
-                                    10**selected_symbol_price_precision)
+        order_size = math.floor(order_size * pow10) / pow10
         corrected_initial_capital = (order_size * price) / LEVERAGE
     else:
         corrected_initial_capital = INITIAL_CAPITAL
 
-    print(f"Order Size (in {base_symbol}): {order_size}", flush=True)
-    print(f"----------------------------------\n", flush=True)
+    log_lines.append(f"Order Size (in {base_symbol}): {order_size}")
+    log_lines.append("----------------------------------\n")
 
-    change_leverage(symbol, LEVERAGE)
+    await change_leverage(symbol, LEVERAGE)
 
-    print(f"Starting trade for {symbol}", flush=True)
-    buy_order = place_buy_order(symbol, order_size)
+    log_lines.append(f"Starting trade for {symbol}")
+    buy_order = await place_buy_order(symbol, order_size)
     if buy_order:
-        print(
-            f"Market Buy Order Executed: {order_size} {base_symbol} at ${price}",
-            flush=True)
+        log_lines.append(
+            f"Market Buy Order Executed: {order_size} {base_symbol} at ${price}"
+        )
+        print("\n".join(log_lines), flush=True)
+        # Stream trade prices while holding instead of polling the REST API
+        latest_prices = {}
+        price_task = asyncio.create_task(
+            watch_trade_price(symbol, latest_prices))
         await asyncio.sleep(HODL_TIME)  # Simulate holding the position
-        print(f"\nHodling for {HODL_TIME} seconds...\n", flush=True)
-        ticker = get_price(symbol)
-        new_price = float(ticker["price"])
-        sell_order = place_sell_order(symbol, order_size)
+        price_task.cancel()
+        log_lines = [f"\nHodling for {HODL_TIME} seconds...\n"]
+        try:
+            await price_task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            # Falls back to REST below
+            log_lines.append(f"Trade price stream for {symbol} failed: {e}")
+        new_price = latest_prices.get(symbol)
+        if new_price is None:
+            # Fall back to REST if no websocket update arrived
+            ticker = await get_price(symbol)
+            new_price = float(ticker["price"])
+        sell_order = await place_sell_order(symbol, order_size)
         if sell_order:
-            print(
-                f"Market Sell Order Executed: {order_size} {base_symbol} at ${new_price}\n",
-                flush=True)
             final_capital = corrected_initial_capital + (
                 (new_price - price) * order_size)
-            print(f"Trade Summary:", flush=True)
-            print(f"----------------------------------", flush=True)
-            print(f"Before Capital: ${corrected_initial_capital:.2f}",
-                  flush=True)
-            print(f"After Capital: ${final_capital:.2f}", flush=True)
-            print(f"----------------------------------\n", flush=True)
+            log_lines += [
+                f"Market Sell Order Executed: {order_size} {base_symbol} at ${new_price}\n",
+                "Trade Summary:",
+                "----------------------------------",
+                f"Before Capital: ${corrected_initial_capital:.2f}",
+                f"After Capital: ${final_capital:.2f}",
+                "----------------------------------\n",
+            ]
         else:
-            print(f"Sell order failed for {symbol}\n", flush=True)
+            log_lines.append(f"Sell order failed for {symbol}\n")
     else:
-        print(f"Buy order failed for {symbol}\n", flush=True)
+        log_lines.append(f"Buy order failed for {symbol}\n")
+    print("\n".join(log_lines), flush=True)
 
     processing_symbols.remove(symbol)
 
@@ -163,44 +197,67 @@ async def simulate_symbol_arrivals():
         # "BNBUSDT",
         # "XRPUSDT",
     ]
+    # Draw arrivals in batches rather than calling random on every tick
+    arrivals = iter(())
     while True:
-        symbol = random.choice(symbols)
+        arrival = next(arrivals, None)
+        if arrival is None:
+            arrivals = iter(
+                zip(random.choices(symbols, k=1000),
+                    [random.uniform(1, 2) for _ in range(1000)]))
+            arrival = next(arrivals)
+        symbol, wait = arrival
 
         # Check if symbol is already in queue or being processed
-        if symbol in processing_symbols or symbol in symbol_queue._queue:
+        if symbol in processing_symbols or symbol in queued_symbols:
             print(
                 f"\n{symbol} is already in queue or being processed, skipping...",
                 flush=True)
         else:
             print(f"\nAdding {symbol} to the queue", flush=True)
-            await symbol_queue.put(symbol)
+            # Resolve the precision and base asset once here rather than in
+            # the trade
+            precision = symbol_quantity_precision_dict.get(symbol)
+            pow10 = POW10[precision] if precision else None
+            base_symbol = symbol.removesuffix("USDT")
+            queued_symbols.add(symbol)
+            await symbol_queue.put((symbol, base_symbol, precision, pow10))
 
-        await asyncio.sleep(random.uniform(1, 2))  # Non-blocking sleep
+        await asyncio.sleep(wait)  # Non-blocking sleep
 
 
 # Worker function to process tickers from the queue asynchronously
 async def worker():
     while True:
-        symbol = await symbol_queue.get(
+        item = await symbol_queue.get(
         )  # Asynchronously get a symbol from the queue
-        if symbol is None:
-            break
 
+        symbol, base_symbol, precision, pow10 = item
+
+        queued_symbols.discard(symbol)
         processing_symbols.add(symbol)
         print(f"Worker processing symbol: {symbol}", flush=True)
 
         # Execute trade
-        await trade(symbol)
+        await trade(symbol, base_symbol, precision, pow10)
 
         symbol_queue.task_done()
 
 
 # Main function to run trades concurrently using a queue
 async def main():
+    global socket_manager
+
     print("\nStarting main function", flush=True)
 
+    # Websocket client for the aggTrade (last trade price) streams
+    async_client = await AsyncClient.create(BINANCE_TESTNET_API_KEY,
+                                            BINANCE_TESTNET_API_SECRET,
+                                            testnet=True)
+    socket_manager = BinanceSocketManager(async_client)
+
     # Start worker tasks
-    workers = [asyncio.create_task(worker()) for _ in range(os.cpu_count())]
+    workers = [asyncio.create_task(worker()) for _ in range(TEST_NUM_WORKERS)]
 
     # Start ticker simulation (async)
     await simulate_symbol_arrivals()
@@ -208,12 +265,12 @@ async def main():
     # Wait for all tasks to complete
     await symbol_queue.join()
 
-    # Stop worker tasks by putting None in the queue to signal termination
-    for _ in range(os.cpu_count()):
-        await symbol_queue.put(None)
+    # Stop worker tasks, they are idle on the queue once it has been drained
+    for w in workers:
+        w.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
 
-    # Wait for workers to finish
-    await asyncio.gather(*workers)
+    await async_client.close_connection()
 
     print("All trades completed.", flush=True)
 
@@ -28,10 +28,15 @@
 
 # from google import genai
 # from google.genai import types
+import orjson
 import requests
-import json
+from requests.adapters import HTTPAdapter
 from config import PROMPT, GEMINI_API_KEY
 
+# Reuse one keep-alive connection pool for every request to the LLM API
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
 # client = genai.Client(api_key=GEMINI_API_KEY)
 
 example_message = """
@@ -73,7 +78,7 @@ data = {
 }
 
 # Send the POST request
-response = requests.post(url, headers=headers, data=json.dumps(data))
+response = session.post(url, headers=headers, data=orjson.dumps(data))
 
 # Check the response
 if response.status_code == 200:
@@ -1,6 +1,5 @@
 import signal
-import json
-import aiofiles
+import sqlite3
 import asyncio
 import random
 import re
@@ -19,12 +18,17 @@ bot = Bot(token=TELEGRAM_BOT_TOKEN,
           default=DefaultBotProperties(parse_mode=ParseMode.HTML))
 app = Client("text_listener", TELEGRAM_API_KEY, TELEGRAM_HASH)
 
-FILE_PATH = "store.json"
-lock = asyncio.Lock()
+DB_PATH = "store.db"
+_cache = None
+total_pnl = 0  # kept alongside _cache so /pnl doesn't re-sum every row
+RANDOM_POOL_SIZE = 10_000
+random_pool = iter(())
 dp = Dispatcher()
 router = Router()
 dp.include_router(router)
 chat_id_name_dict = {}
+_ALNUM_RE = re.compile(r'[^A-Za-z0-9\s]')
+_WS_RE = re.compile(r'\s+')
 
 
 async def check_bot_membership():
@@ -45,46 +49,80 @@ async def check_bot_membership():
         asyncio.get_event_loop().stop()
 
 
-async def load_data():
-    """Load JSON data asynchronously without acquiring the lock."""
-    try:
-        async with aiofiles.open(FILE_PATH, "r") as f:
-            contents = await f.read()
-            return json.loads(contents)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
+# WAL lets /pnl reads proceed while an update is being written
+db = sqlite3.connect(DB_PATH, isolation_level=None, check_same_thread=False)
+db.execute("PRAGMA journal_mode=WAL")
+db.execute("CREATE TABLE IF NOT EXISTS store "
+           "(chat_id TEXT PRIMARY KEY, pnl REAL NOT NULL)")
+
+
+def _read_sync():
+    return dict(db.execute("SELECT chat_id, pnl FROM store ORDER BY chat_id"))
 
 
-async def save_data(data):
-    """Save JSON data asynchronously."""
-    async with aiofiles.open(FILE_PATH, "w") as f:
-        await f.write(json.dumps(data, indent=4))
+def _upsert_sync(key, value):
+    db.execute(
+        "INSERT INTO store (chat_id, pnl) VALUES (?, ?) "
+        "ON CONFLICT(chat_id) DO UPDATE SET pnl = ROUND(pnl + excluded.pnl, 2)",
+        (key, value))
+
+
+async def load_data():
+    """Return a copy of the in-memory totals, reading the database on first use."""
+    global _cache, total_pnl
+    if _cache is None:
+        data = await asyncio.to_thread(_read_sync)
+        if _cache is None:
+            _cache = data
+            total_pnl = round(sum(data.values()), 2)
+    return dict(_cache)
 
 
 async def update_data(new_data):
-    """Load, update by summing values, and save JSON data with a lock."""
-    async with lock:
-        data = await load_data()
-        key, value = list(new_data.items())[0]
-        data[key] = round(data.get(key, 0) + value, 2)
-        await save_data(data)
+    """Add a PnL delta to its chat's row and return the updated totals.
+
+    No lock is needed: the upsert is atomic in sqlite, and the cache update
+    below has no await between its read and write.
+    """
+    global total_pnl
+    if _cache is None:
+        await load_data()
+    key, value = next(iter(new_data.items()))
+    value = round(value, 2)
+    # Write-through: a single-row upsert, however many chats are stored
+    await asyncio.to_thread(_upsert_sync, key, value)
+    _cache[key] = round(_cache.get(key, 0) + value, 2)
+    total_pnl = round(total_pnl + value, 2)
+    return dict(_cache)
+
+
+def build_random_pool(size=RANDOM_POOL_SIZE):
+    """Draw a batch of (chat_id, net_profit) pairs in one go."""
+    chat_ids = random.choices([str(chat_id) for chat_id in CHAT_ID_LIST],
+                              k=size)
+    net_profits = [round(random.uniform(-1000, 1000), 2) for _ in range(size)]
+    return iter(zip(chat_ids, net_profits))
 
 
 async def generate_random_chat_id_net_profit():
     """Generate a random key-value pair."""
-    random_chat_id = random.choice(CHAT_ID_LIST)
-    net_profit = round(random.uniform(-1000, 1000), 2)
-    return {str(random_chat_id): net_profit}
+    global random_pool
+    pair = next(random_pool, None)
+    if pair is None:
+        random_pool = build_random_pool()
+        pair = next(random_pool)
+    random_chat_id, net_profit = pair
+    return {random_chat_id: net_profit}
 
 
 async def demo():
-    """Run indefinitely, updating and replacing JSON data continuously."""
+    """Run indefinitely, updating the stored PnL continuously."""
     print("🔹 Initial Load:", await load_data())
 
     while True:
         new_data = await generate_random_chat_id_net_profit()
-        await update_data(new_data)
-        print(f"🔸 Updated JSON:", await load_data())
+        updated = await update_data(new_data)
+        print("🔸 Updated JSON:", updated)
         await asyncio.sleep(2)
 
 
@@ -113,16 +151,15 @@ async def cmd_pnl(message: Message,
                   chat_name_width: int = 17,
                   pnl_width: int = 12):
     """Handle /pnl command, send current data to Telegram group."""
-    data = await load_data()
+    if _cache is None:
+        await load_data()
     renamed_data = []
-    total_pnl = 0
-    for chat_id, pnl in data.items():
+    for chat_id, pnl in _cache.items():
         chat_name = chat_id_name_dict.get(chat_id, chat_id)
-        chat_name = re.sub(r'[^A-Za-z0-9\s]', '', chat_name)
-        chat_name = re.sub(r'\s+', ' ', chat_name)
+        chat_name = _ALNUM_RE.sub('', chat_name)
+        chat_name = _WS_RE.sub(' ', chat_name)
         chat_name = chat_name.strip()
         renamed_data.append((chat_name, pnl))
-        total_pnl += pnl
     sorted_data = sorted(renamed_data, key=lambda x: x[0])
 
     table = pt.PrettyTable(['Chat Name', 'PNL (in USD)'])
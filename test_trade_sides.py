@@ -0,0 +1,34 @@
+from trade_sides import (ENTRY_ORDER_SIDE, EXIT_ORDER_SIDE, DIRECTION_SIGN,
+                         calculate_final_capital)
+
+
+def test_long_trade():
+    # A long position is opened with a buy and closed with a sell
+    assert ENTRY_ORDER_SIDE["LONG"] == "BUY"
+    assert EXIT_ORDER_SIDE["LONG"] == "SELL"
+    # Gains when the price rises, loses when it falls
+    assert calculate_final_capital("LONG", 100, 10, 11, 50) == 150
+    assert calculate_final_capital("LONG", 100, 10, 9, 50) == 50
+
+
+def test_short_trade():
+    # A short position is opened with a sell and closed with a buy
+    assert ENTRY_ORDER_SIDE["SHORT"] == "SELL"
+    assert EXIT_ORDER_SIDE["SHORT"] == "BUY"
+    # Gains when the price falls, loses when it rises
+    assert calculate_final_capital("SHORT", 100, 10, 9, 50) == 150
+    assert calculate_final_capital("SHORT", 100, 10, 11, 50) == 50
+
+
+def test_exit_reverses_entry():
+    # Every direction must close with the opposite side it opened with
+    for direction in DIRECTION_SIGN:
+        assert {ENTRY_ORDER_SIDE[direction],
+                EXIT_ORDER_SIDE[direction]} == {"BUY", "SELL"}
+
+
+if __name__ == "__main__":
+    test_long_trade()
+    test_short_trade()
+    test_exit_reverses_entry()
+    print("All trade side checks passed.")
@@ -0,0 +1,13 @@
+# Binance order side and PnL sign for each trade direction. Kept free of
+# client and Telegram imports so test_trade_sides.py can check it offline
+ENTRY_ORDER_SIDE = {"LONG": "BUY", "SHORT": "SELL"}
+EXIT_ORDER_SIDE = {"LONG": "SELL", "SHORT": "BUY"}
+DIRECTION_SIGN = {"LONG": 1, "SHORT": -1}
+
+
+def calculate_final_capital(direction, initial_capital, entry_price,
+                            exit_price, order_size):
+    """Capital after closing a position, gaining when the price moves in the
+    trade's direction."""
+    return initial_capital + DIRECTION_SIGN[direction] * (
+        exit_price - entry_price) * order_size